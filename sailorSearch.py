@@ -1,13 +1,17 @@
 """
 Simulation game for a Coast Guard search and rescue effort. Players will use Bayes' Rule to guide decisions to locate
-the sailor as quickly as possible. Will use OpenCV and numpy. Searches for the sailor over 3 contiguous search areas.
+the sailor as quickly as possible. Will use OpenCV and numpy. Searches for the sailor over 3 contiguous search areas
+by default, or any number of rectangles, polygons or grid cells passed in as the search areas.
 Displays a mpa, prints a menu of search choices for the user, randomly chooses a location for the sailor & either reveal
 the location if a search locates him/her or do a Bayesian update of the probabilities of finding the sailor for each
 area.
 """
 import sys
-import random
+import json
+import time
 import itertools
+from math import comb
+from contextlib import contextmanager
 import numpy as np
 import cv2 as cv
 
@@ -20,298 +24,784 @@ SA1_CORNERS = (130, 265, 180, 315) # (UL-X, UL-Y, LR-X, LR-Y)
 SA2_CORNERS = (80, 255, 130, 305)
 SA3_CORNERS = (105, 205, 155, 255)
 
+# Search areas of the default game, each one is either rectangle corners or a list of (x, y) polygon vertices
+SEARCH_AREAS = (SA1_CORNERS, SA2_CORNERS, SA3_CORNERS)
+
+# Pre search probs for finding the sailor in each of the default search areas
+PRIORS = (0.2, 0.5, 0.3)
+
+# Range of the SEP drawn for each area every round
+SEP_LOW = 0.2
+SEP_HIGH = 0.9
+
+# Map pixels at least this bright are water, the land is gray & the coastline black
+WATER_LEVEL = 200
+
+# Patches of water smaller than this many pixels are specks in the land, not somewhere the sailor can be
+MIN_WATER_PIXELS = 20
+
+# Search teams the ranking under the menu sends out, set by running with --teams N
+NUM_TEAMS = 2
+
+# Number of ranked allocations printed under the menu
+TOP_ALLOCATIONS = 5
+
+# The ranking is left off the menu when the allocations would take more than this many counts (allocations x areas)
+MAX_ALLOCATION_CELLS = 10**7
+
+# Target probs under this are taken from their logs by the Bayes update, far enough above the smallest float that a
+# prob never loses precision before it gets there
+TINY_PROB = 1e-200
+
+# Never open an OpenCV window when True, set by running with --headless
+HEADLESS = False
+
+# File every game played is appended to as 1 line of JSON, set by running with --record FILE (None = no log)
+RECORD_FILE = None
+
+# Seconds the game loop spends in each phase, None unless running with --profile
+PROFILE = None
+
+# Decoded maps, their water masks & annotated base layers, built once per process and shared read only by every Search
+# (and by the worker processes forked after they're loaded)
+MAP_CACHE = {}
+WATER_CACHE = {}
+BASE_LAYER_CACHE = {}
+
+# Every allocation of teams over areas, keyed by (number of areas, number of teams)
+ALLOCATION_CACHE = {}
+
+# Number of set bits in every byte, popcount of a packed bitset is a lookup & a sum
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
 
 # Part 2 - Define the search class, the blueprint of the game
 class Search():
-    """Bayesian Search & Rescue game with 3 search areas."""
-    def __init__(self, name):
+    """Bayesian Search & Rescue game over any number of search areas."""
+    def __init__(self, name, areas=SEARCH_AREAS, priors=None, verbose=True, seed=None, map_file=MAP_FILE):
         self.name = name
-        # The image is grayscale so use cv.IMREAD_COLOR to load the image in color mode.
-        self.img = cv.imread(MAP_FILE, cv.IMREAD_COLOR)
-        # Exit the program if the MAP_FILE variable does not exist
+        # The decoded map is shared & read only, draw_map() gives each game its own copy to draw on
+        self.map_file = map_file
+        self.img = load_map(map_file)
+        # Exit the program if the map file does not exist
         if self.img is None:
-            print('Could not load map file {}'.format(MAP_FILE), file=sys.stderr)
+            print('Could not load map file {}'.format(map_file), file=sys.stderr)
             sys.exit(1)
 
+        # Search areas & the number of them, everything per area below is an array indexed by area id (0 based)
+        self.areas = list(areas)
+        self.num_areas = len(self.areas)
+        # Default priors for the 3 area game, otherwise every area starts equally likely
+        if priors is None:
+            priors = PRIORS if self.num_areas == len(PRIORS) else np.full(self.num_areas, 1 / self.num_areas)
+        self.priors = np.array(priors, dtype=float)
+
+        # Label every water pixel with the id of its search area (-1 = land or not in any area), so the cells of an
+        # area are only the ones the sailor can be in & the placement, searches & SEPs never touch land
+        self.labels = label_areas(self.areas, self.img.shape[:2], water_mask(map_file))
+        flat_labels = self.labels.ravel()
+        # Sort the flat pixel indexes by area so the cells of area i are one slice of self.cells
+        order = np.argsort(flat_labels, kind='stable')
+        self.sizes = np.bincount(flat_labels[flat_labels >= 0], minlength=self.num_areas)
+        # An area that is all land (a grid cell over the coast) keeps its place in the menu with no cells & a prior of
+        # 0, so the sailor is never placed there & searching it finds nothing
+        if self.sizes.sum() == 0:
+            raise ValueError('None of the {} search areas has any water on the map'.format(self.num_areas))
+        if (self.sizes == 0).any():
+            self.priors[self.sizes == 0] = 0
+            if self.priors.sum() == 0:
+                raise ValueError('The priors are all on search areas with no water on the map')
+            self.priors /= self.priors.sum()
+        self.cells = order[len(order) - self.sizes.sum():]
+        self.starts = np.concatenate(([0], np.cumsum(self.sizes)))
+        # Area id + 1 of every pixel (0 = not in any area), for summing pixel maps per area with bincount
+        self.pixel_areas = flat_labels + 1
+
+        # Prior probability map of every pixel, each area's prior spread evenly over its cells
+        self.prior_map = np.zeros(self.labels.size)
+        self.prior_map[self.cells] = np.repeat(self.priors / np.maximum(self.sizes, 1), self.sizes)
+        # Running total of the prior of every cell in the areas, the sailor is placed by a binary search of it so
+        # he/she lands where the priors say, the same belief the Bayes updates start from
+        self.placement_table = cumulative_table(self.prior_map[self.cells])
+
+        # Challenge 1 - Each area's slice of self.order is a running shuffle of the area's positions in self.cells, the
+        # cells before the area's cursor (sizes - unsearched) have been searched & the ones after it haven't
+        self.reseed(seed)
+
+        # Print game messages (turned off when running headless simulations)
+        self.verbose = verbose
+
+        # Set all the per game attributes
+        self.reset()
+
+    def reseed(self, seed=None):
+        """Start the search draws over like a newly built Search, seeded from np.random when seed is None so seeding
+        np.random seeds the game"""
+        self.order = np.arange(len(self.cells))
+        self.rng = np.random.default_rng(np.random.randint(2**63) if seed is None else seed)
+
+    def reset(self):
+        """Set the per game attributes back to the start of a new game without reloading the map"""
         # Assign attributes for the sailor's actual location
         self.area_actual = 0 # Number of the search area
         # Precise x,y location
-        self.sailor_actual = [0, 0] # As 'local' coords within search area
-
-        # To work with location coords within a search area create a subarray from the array
-        self.sa1 = self.img[SA1_CORNERS[1] : SA1_CORNERS[3],
-                            SA1_CORNERS[0] : SA1_CORNERS[2]]
-        self.sa2 = self.img[SA2_CORNERS[1] : SA2_CORNERS[3],
-                            SA2_CORNERS[0] : SA2_CORNERS[2]]
-        self.sa3 = self.img[SA3_CORNERS[1] : SA3_CORNERS[3],
-                            SA3_CORNERS[0] : SA3_CORNERS[2]]
-
-        # Set the pre search probs for finding the sailor in each area
-        self.p1 = 0.2
-        self.p2 = 0.5
-        self.p3 = 0.3
-
-        # Placeholder attributes for the SEP
-        self.sep1 = 0
-        self.sep2 = 0
-        self.sep3 = 0
+        self.sailor_actual = [0, 0] # As global coords on the map
+        self.sailor_cell = -1 # Same location as an index into the flattened map
+
+        # Set the pre search probs for finding the sailor in each area, kept as logs too so the Bayes updates of a
+        # long game never underflow
+        self.set_target_probs(self.priors)
+
+        # Placeholder for the SEP of each area
+        self.seps = np.zeros(self.num_areas)
+
+        # Cells left to search in each area, an area is fully searched when it hits 0. Putting it back to the sizes
+        # rewinds every area's cursor, the shuffle left from the last game needs no rebuild since the next draws are
+        # uniform whatever order the cells are in
+        self.unsearched = self.sizes.copy()
+        # Challenge 1 - Search history of each area, a packed bitset with 1 bit per cell (size / 8 bytes however long
+        # the game runs). Only made the first time the area is searched so resetting doesn't clear every bitset
+        self.searched_bits = [None] * self.num_areas
+
+        # Posterior probability of the sailor being on each pixel of the flattened map, only built the first time
+        # revise_posterior() runs since headless games never use it
+        self.posterior = None
+
+    def area_cells(self, area):
+        """Return the flat map indexes of the cells of an area (0 based id)"""
+        return self.cells[self.starts[area]:self.starts[area + 1]]
+
+    def area_bits(self, area):
+        """Return the packed bitset of the cells of an area (0 based id) searched so far this game"""
+        if self.searched_bits[area] is None:
+            self.searched_bits[area] = np.zeros((self.sizes[area] + 7) // 8, dtype=np.uint8)
+        return self.searched_bits[area]
+
+    def searched_cells(self):
+        """Return the flat map indexes of every cell searched so far this game"""
+        positions = [self.starts[area] + unpack_cells(bits, self.sizes[area])
+                     for area, bits in enumerate(self.searched_bits) if bits is not None]
+        return self.cells[np.concatenate(positions)] if positions else np.zeros(0, dtype=np.int64)
 
         # Part 3 - Create a method that displays the base map
     def draw_map(self, last_known):
         """Display basemap with scale, last knwon xy location, search areas."""
-        # Draw a scale bar
-        cv.line(self.img, (20, 370), (70, 370), (0, 0, 0), 2)
-        # Annotate the scale bar
-        cv.putText(self.img, '0', (8, 370), cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 0))
-        cv.putText(self.img, '50 Nautical Miles', (71, 370),
-                   cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 0))
-
-        # Draw a rectangle for the 3 search areas
-        cv.rectangle(self.img, (SA1_CORNERS[0], SA1_CORNERS[1]),
-                               (SA1_CORNERS[2], SA1_CORNERS[3]), (0, 0, 0), 1)
-        # Put the search are number inside the upper-left corner of each rectangle
-        cv.putText(self.img, '1',
-                   (SA1_CORNERS[0] + 3, SA1_CORNERS[1] + 15),
-                   cv.FONT_HERSHEY_PLAIN, 1, 0)
-        cv.rectangle(self.img, (SA2_CORNERS[0], SA2_CORNERS[1]),
-                               (SA2_CORNERS[2], SA2_CORNERS[3]), (0, 0, 0), 1)
-        cv.putText(self.img, '2',
-                   (SA2_CORNERS[0] + 3, SA2_CORNERS[1] + 15),
-                   cv.FONT_HERSHEY_PLAIN, 1, 0)
-        cv.rectangle(self.img, (SA3_CORNERS[0], SA3_CORNERS[1]),
-                               (SA3_CORNERS[2], SA3_CORNERS[3]), (0, 0, 0), 1)
-        cv.putText(self.img, '3',
-                   (SA3_CORNERS[0] + 3, SA3_CORNERS[1] + 15),
-                   cv.FONT_HERSHEY_PLAIN, 1, 0)
-
-        # Place '+' at the sailor's last know location
-        cv.putText(self.img, '+', (last_known),
-                   cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 255))
-        cv.putText(self.img, '+ = Last Known Position', (274, 355),
-                   cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 255))
-        cv.putText(self.img, '* = Actual Position', (275, 370),
-                   cv.FONT_HERSHEY_PLAIN, 1, (255, 0, 0))
-
-        # Finish method by showing the bass map
-        cv.imshow('Search Area', self.img)
-        # Force base map to display in the upper right corner of the monitor
-        cv.moveWindow('Search Area', 750, 10)
-        # Game menu should appear a half second after the base map
-        cv.waitKey(500)
+        # The scale, areas & legends are only drawn once per process, each game gets a cheap copy for its markers
+        self.img = base_layer(self.areas, last_known, self.map_file).copy()
+        show_map(self.img, 500)
 
     # Part 4 - Method to randomly choose the sailor's actual location
-    def sailor_final_location(self, num_search_areas):
+    def sailor_final_location(self, num_search_areas=None):
         """Return the actual x, y location of the missing sailor"""
-        # Find sailor coordinates, since all search areas are the same size
-        self.sailor_actual[0] = np.random.choice(self.sa1.shape[1], 1)
-        self.sailor_actual[1] = np.random.choice(self.sa1.shape[0], 1)
-
-        # Choose a search area by using the triangular distribution
-        area = int(random.triangular(1, num_search_areas + 1))
-
-        if area == 1:
-            # Convert search location to global image
-            x = self.sailor_actual[0] + SA1_CORNERS[0]
-            y = self.sailor_actual[1] + SA1_CORNERS[1]
-            # Update to keep track of the search area
-            self.area_actual = 1
-        elif area == 2:
-            # Convert search location to global image
-            x = self.sailor_actual[0] + SA2_CORNERS[0]
-            y = self.sailor_actual[1] + SA2_CORNERS[1]
-            # Update to keep track of the search area
-            self.area_actual = 2
-        elif area == 3:
-            # Convert search location to global image
-            x = self.sailor_actual[0] + SA3_CORNERS[0]
-            y = self.sailor_actual[1] + SA3_CORNERS[1]
-            # Update to keep track of the search area
-            self.area_actual = 3
-        return x, y
+        if num_search_areas is None:
+            num_search_areas = self.num_areas
+        if self.starts[num_search_areas] == 0:
+            raise ValueError('The first {} search areas have no water on the map'.format(num_search_areas))
+        # Draw the sailor's cell from the priors of the cells of the first num_search_areas areas, O(log cells)
+        position = sample_index(self.placement_table[:self.starts[num_search_areas]], self.rng.random())
+        self.sailor_cell = self.cells[position]
+        # Update to keep track of the search area, area i is the slice of self.cells from starts[i - 1] (an area with
+        # no cells has the same start as the next one, so side='right' skips it)
+        self.area_actual = int(np.searchsorted(self.starts, position, side='right'))
+        y, x = np.unravel_index(self.sailor_cell, self.labels.shape)
+        self.sailor_actual = [int(x), int(y)]
+        return self.sailor_actual[0], self.sailor_actual[1]
 
     # Part 5 - Calculating search effectiveness and conducting the search
     def calc_search_effectiveness(self):
         """Set decimal search effectiveness value per search area [random between .2-.9]"""
-        self.sep1 = random.uniform(0.2, 0.9)
-        self.sep2 = random.uniform(0.2, 0.9)
-        self.sep3 = random.uniform(0.2, 0.9)
-
-    # Necessary parameters are the area to search chosen by player, area sub_array and randomly set SEP value
-    def conduct_search(self, area_num, area_array, effectiveness_prob, coords_lst):
-        """Return search results and list of searched coordinates"""
-        local_y_range = range(area_array.shape[0])
-        local_x_range = range(area_array.shape[1])
-        # Generate list of all coordinates in the search area
-        coords = list(itertools.product(local_x_range, local_y_range))
-        coords_not_searched = set()
-        # Challenge 1 - Now create new coords list that takes into account any already searched areas
-        if len(coords_lst) > 0:
-            # Search through all values in lists of lists so if area is already search
-            for i in range(len(coords_lst)):
-                print(len(coords_lst[i]))
-                searched_coords = [x for x in coords if x not in coords_lst[i]]
-                for x in searched_coords:
-                    coords_not_searched.add(x)
-                # This is an addition to make sure that when a user has fully searched an area they are aware of that
-                if len(coords_not_searched) == 2500:
-                    print("This implies the whole area has already been searched!")
-                    main()
-        else:
-            coords_not_searched = coords
-        coords_not_searched = list(coords_not_searched)
-        # Shuffle to not keep searchin the same end with every search event
-        random.shuffle(coords_not_searched)
-        # See if there is any area in the new coords list that would not be searched
-        lst_len = int((len(coords) * effectiveness_prob))
-        if len(coords_not_searched) - lst_len >= 0:
-            # Trim the search area based on the SEP value
-            coords_not_searched = coords_not_searched[:lst_len]
-        loc_actual = (self.sailor_actual[0], self.sailor_actual[1])
+        self.seps = np.random.uniform(SEP_LOW, SEP_HIGH, self.num_areas)
+
+    # Necessary parameters are the area to search chosen by player and randomly set SEP value
+    def conduct_search(self, area_num, effectiveness_prob):
+        """Return search results, the flat map indexes of the newly searched cells & whether the sailor was covered"""
+        area = area_num - 1
+        left = self.unsearched[area]
+        bits = self.area_bits(area)
+        # This is an addition to make sure that when a user has fully searched an area they are aware of that
+        if self.verbose and popcount(bits) == self.sizes[area]:
+            print("This implies the whole area has already been searched!")
+        # See how many cells the SEP allows, trimmed to what is left of the area
+        lst_len = min(int(self.sizes[area] * effectiveness_prob), left)
+        # Challenge 1 - Only the cells after the area's cursor can be picked, so nothing is ever searched twice
+        end = self.starts[area_num]
+        picked = draw_to_front(self.order[end - left:end], lst_len, self.rng)
+        self.unsearched[area] -= lst_len
+        # Add the search to the area's history, a union done in place in O(cells picked)
+        add_cells(bits, picked - self.starts[area])
+        coords_searched = self.cells[picked]
         # Check if the sailor was found or not
-        if area_num == self.area_actual and loc_actual in coords_not_searched:
-            return 'Found in Area {}.'.format(area_num), coords_not_searched
+        found = bool(np.any(coords_searched == self.sailor_cell))
+        if found:
+            return 'Found in Area {}.'.format(area_num), coords_searched, found
         else:
-            return 'Not Found', coords_not_searched
-
+            return 'Not Found', coords_searched, found
+
+    # Part 5b - Run the 2 searches for a menu choice
+    def search_choice(self, choice):
+        """Run both searches for a menu choice and set the SEPs, return both results and found flags"""
+        area_1, area_2 = option_to_areas(int(choice), self.num_areas)
+        seps = self.seps
+        results_1, coords_1, found_1 = self.conduct_search(area_1 + 1, seps[area_1])
+        results_2, coords_2, found_2 = self.conduct_search(area_2 + 1, seps[area_2])
+        # Only the searched areas keep a SEP, the rest weren't searched this round
+        self.seps = np.zeros(self.num_areas)
+        if area_1 == area_2:
+            # Determine overall sep for both searches on the same area, the 2 searches never overlap
+            self.seps[area_1] = (len(coords_1) + len(coords_2)) / max(self.sizes[area_1], 1)
+        else:
+            # Searching 2 areas means no need to recalculate SEP
+            self.seps[area_1] = seps[area_1]
+            self.seps[area_2] = seps[area_2]
+        return results_1, results_2, found_1, found_2
 
     # Part 6 - Applying Bayes' Rule and drawing a menu
     def revise_target_probs(self):
         """Update area target probabilities based on search effectiveness"""
-        denom = self.p1 * (1 - self.sep1) + self.p2 * (1 - self.sep2) + self.p3 * (1 - self.sep3)
-        if denom == 0:
-            denom = 0.000000001
-        self.p1 *= (1 - self.sep1) / denom
-        self.p2 *= (1 - self.sep2) / denom
-        self.p3 *= (1 - self.sep3) / denom
+        # An area with nothing left to search can't be hiding the sailor anymore
+        self.seps[self.unsearched == 0] = 1
+        self.log_probs, self.probs = log_bayes_update(self.log_probs, self.probs, self.seps)
+
+    def set_target_probs(self, probs):
+        """Set the target probs (& their logs) to probs, which add up to 1"""
+        self.probs = np.array(probs, dtype=float)
+        with np.errstate(divide='ignore'):
+            self.log_probs = np.log(self.probs)
+
+    def revise_posterior(self):
+        """Update the per pixel probability map with Bayes' Rule from the cells actually searched"""
+        if self.posterior is None:
+            self.posterior = self.prior_map.copy()
+        # A searched cell would have found the sailor, so its likelihood is 0 and every other cell's is 1
+        self.posterior[self.searched_cells()] = 0
+        total = self.posterior.sum()
+        if total > 0:
+            self.posterior *= 1 / total
+
+    def posterior_area_probs(self):
+        """Return the probability of each area from the pixel map, the sum of the posterior over its cells"""
+        # Nothing revised yet, the pixel map is still the priors
+        if self.posterior is None:
+            return self.priors.copy()
+        return np.bincount(self.pixel_areas, weights=self.posterior, minlength=self.num_areas + 1)[1:]
+
+
+# Part 3b - Loading, annotating & showing the map once per process
+def load_map(map_file=MAP_FILE):
+    """Return the decoded map (read only), only read from disk the first time in a process, None if it can't load"""
+    if map_file not in MAP_CACHE:
+        # The image is grayscale so use cv.IMREAD_COLOR to load the image in color mode.
+        img = cv.imread(map_file, cv.IMREAD_COLOR)
+        if img is None:
+            return None
+        img.flags.writeable = False
+        MAP_CACHE[map_file] = img
+    return MAP_CACHE[map_file]
+
+
+def water_mask(map_file=MAP_FILE):
+    """Return the read only bool mask of the water pixels of the map, segmented the first time in a process, None if
+    the map can't load"""
+    if map_file not in WATER_CACHE:
+        img = load_map(map_file)
+        if img is None:
+            return None
+        water = cv.cvtColor(img, cv.COLOR_BGR2GRAY) >= WATER_LEVEL
+        # Drop the specks, every patch of water is 1 connected component & the small ones go back to land
+        _, patches, stats, _ = cv.connectedComponentsWithStats(water.astype(np.uint8), connectivity=4)
+        keep = stats[:, cv.CC_STAT_AREA] >= MIN_WATER_PIXELS
+        keep[0] = False
+        water = keep[patches]
+        water.flags.writeable = False
+        WATER_CACHE[map_file] = water
+    return WATER_CACHE[map_file]
+
+
+def area_sizes(areas=SEARCH_AREAS, map_file=MAP_FILE):
+    """Return the number of water cells in every search area, the cells a Search of the areas plays on"""
+    labels = label_areas(areas, load_map(map_file).shape[:2], water_mask(map_file))
+    return np.bincount(labels[labels >= 0], minlength=len(areas))
+
+
+def base_layer(areas, last_known, map_file=MAP_FILE):
+    """Return the read only map annotated with the scale, search areas & legends, drawn once per set of areas"""
+    key = (map_file, repr(areas), tuple(last_known))
+    if key not in BASE_LAYER_CACHE:
+        img = load_map(map_file).copy()
+        # Draw a scale bar
+        cv.line(img, (20, 370), (70, 370), (0, 0, 0), 2)
+        # Annotate the scale bar
+        cv.putText(img, '0', (8, 370), cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 0))
+        cv.putText(img, '50 Nautical Miles', (71, 370),
+                   cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 0))
 
+        # Draw the outline of every search area
+        for i, area in enumerate(areas):
+            if is_rectangle(area):
+                cv.rectangle(img, (area[0], area[1]), (area[2], area[3]), (0, 0, 0), 1)
+                corner = (area[0], area[1])
+            else:
+                cv.polylines(img, [np.array(area, dtype=np.int32)], True, (0, 0, 0), 1)
+                corner = tuple(np.min(area, axis=0))
+            # Put the search area number inside the upper-left corner, only readable for a handful of areas
+            if len(areas) <= 30:
+                cv.putText(img, str(i + 1), (int(corner[0]) + 3, int(corner[1]) + 15),
+                           cv.FONT_HERSHEY_PLAIN, 1, 0)
 
-def draw_menu(search_num):
-    """Print menu of choices for conducting search areas"""
+        # Place '+' at the sailor's last know location
+        cv.putText(img, '+', (tuple(last_known)),
+                   cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 255))
+        cv.putText(img, '+ = Last Known Position', (274, 355),
+                   cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 255))
+        cv.putText(img, '* = Actual Position', (275, 370),
+                   cv.FONT_HERSHEY_PLAIN, 1, (255, 0, 0))
+        img.flags.writeable = False
+        BASE_LAYER_CACHE[key] = img
+    return BASE_LAYER_CACHE[key]
+
+
+def show_map(img, wait):
+    """Show the map in the 'Search Area' window for wait ms, no OpenCV window calls at all when HEADLESS"""
+    if HEADLESS:
+        return
+    cv.imshow('Search Area', img)
+    # Force base map to display in the upper right corner of the monitor
+    cv.moveWindow('Search Area', 750, 10)
+    cv.waitKey(wait)
+
+
+# Part 4b - Drawing from a table of weights, the sailor's cell from the prior of every cell
+def cumulative_table(weights):
+    """Return the running total of weights, the table sample_index() draws from"""
+    return np.cumsum(weights, dtype=float)
+
+
+def sample_index(table, u):
+    """Return the index of the weight each uniform [0, 1) u lands on, index i has prob weight i / total weight.
+    A binary search of the running totals, u can be a float or an array for a batch of draws"""
+    index = np.searchsorted(table, np.asarray(u) * table[-1], side='right')
+    # Rounding can put u * total past the last total, keep it on the last index
+    index = np.minimum(index, len(table) - 1)
+    return int(index) if index.ndim == 0 else index
+
+
+# Part 5c - Drawing the cells a search covers
+def draw_to_front(tail, num_cells, rng):
+    """Move num_cells entries picked uniformly at random to the front of tail (a view) & return them, in
+    O(num_cells) time however long tail is, the next num_cells steps of a Fisher-Yates shuffle done in bulk"""
+    picked = rng.choice(len(tail), num_cells, replace=False, shuffle=False)
+    # Picks already in the front block stay put, every other pick swaps with a front slot that wasn't picked
+    in_front = np.zeros(num_cells, dtype=bool)
+    in_front[picked[picked < num_cells]] = True
+    outside = picked[picked >= num_cells]
+    free = np.flatnonzero(~in_front)
+    tail[free], tail[outside] = tail[outside], tail[free]
+    return tail[:num_cells]
+
+
+# Part 5d - Packed bitsets of searched cells, bit i of byte j is cell 8j + i of the area
+def add_cells(bits, positions):
+    """Set the cells at positions in a packed bitset (in place), the union of the bitset & those cells"""
+    np.bitwise_or.at(bits, positions >> 3, np.left_shift(1, positions & 7).astype(np.uint8))
+
+
+def unpack_cells(bits, size):
+    """Return the positions of the set cells of a packed bitset"""
+    return np.flatnonzero(np.unpackbits(bits, count=size, bitorder='little'))
+
+
+def popcount(bits):
+    """Return the number of set cells of a packed bitset"""
+    return int(POPCOUNT[bits].sum())
+
+
+# Part 5e - SEP distributions, from uniform [0, 1) draws so they can be shared & mirrored by the simulators
+def triangular_from_uniform(u, low, high, mode=None):
+    """Return triangular draws from uniform u by the inverse CDF (mode defaults to the middle like random.triangular)"""
+    if mode is None:
+        mode = (low + high) / 2
+    c = (mode - low) / (high - low)
+    return np.where(u < c,
+                    low + np.sqrt(u * (high - low) * (mode - low)),
+                    high - np.sqrt((1 - u) * (high - low) * (high - mode)))
+
+
+def sep_from_uniform(u, sep_dist='uniform'):
+    """Return SEPs from uniform u, 'uniform' like sailorSearch.py or 'triangular' like sailorSearch_pod.py"""
+    if sep_dist == 'triangular':
+        return triangular_from_uniform(u, SEP_LOW, SEP_HIGH)
+    return SEP_LOW + (SEP_HIGH - SEP_LOW) * u
+
+
+# Part 6a - Bayes' Rule in float, with logs for the areas that get very unlikely
+def log_bayes_update(log_p, p, sep):
+    """Return the log target probs & the target probs after a miss with search effectiveness sep, normalized so the
+    probs add up to 1 (along the last axis, so they can be 1 game or a (games, areas) batch). log_p is only right for
+    the probs under TINY_PROB & is updated in place, those are the only areas that need it.
+
+    Each area is multiplied by 1 - sep & the total divided out in float, the plain float update. Only the probs under
+    TINY_PROB pay for a log or an exp: a prob's log is taken once it gets there & carried on in log space from then on,
+    so areas that get very unlikely keep their exact ratios instead of underflowing to 0 (about 1.3 times the plain
+    update on a million areas, for the extra compare & the tiny probs). An area searched with sep 1 goes to -inf (prob
+    0). If every area is ruled out, which only happens after the sailor has been found, every prob comes back 0 instead
+    of dividing by 0.
+    """
+    shape = p.shape
+    num_areas = shape[-1]
+    # Flat views, the tiny probs are found as flat indexes (row * num_areas + area)
+    log_p, p, sep = log_p.reshape(-1), p.reshape(-1), sep.reshape(-1)
+    probs = p * (1 - sep)
+    tiny = np.flatnonzero(probs < TINY_PROB)
+    with np.errstate(divide='ignore'):
+        # A prob that just got under TINY_PROB was still exact in float before this round, so its log starts there
+        before = p[tiny]
+        log_p[tiny] = np.where(before < TINY_PROB, log_p[tiny], np.log(before)) + np.log1p(-sep[tiny])
+    probs[tiny] = np.exp(log_p[tiny])
+    log_p, probs = log_p.reshape(-1, num_areas), probs.reshape(-1, num_areas)
+    total = probs.sum(axis=1, keepdims=True)
+    # A game whose every area is under the smallest float normalizes from its logs, shifted by the largest log so
+    # the biggest area is exp(0) = 1
+    lost = np.flatnonzero(total[:, 0] == 0)
+    if len(lost):
+        top = np.max(log_p[lost], axis=1, keepdims=True)
+        log_p[lost] -= np.where(np.isfinite(top), top, 0)
+        total[lost] = np.exp(log_p[lost]).sum(axis=1, keepdims=True)
+    total = np.where(total > 0, total, 1)
+    probs /= total
+    log_p, probs = log_p.reshape(-1), probs.reshape(-1)
+    log_p[tiny] -= np.log(total[tiny // num_areas, 0])
+    probs[tiny] = np.exp(log_p[tiny])
+    return log_p.reshape(shape), probs.reshape(shape)
+
+
+# Part 6b - Building the search areas
+def is_rectangle(area):
+    """Return True when an area is given as (UL-X, UL-Y, LR-X, LR-Y) corners instead of polygon vertices"""
+    return len(area) == 4 and all(np.isscalar(v) for v in area)
+
+
+def label_areas(areas, shape, water=None):
+    """Return an int map of the area id (0 based) of every pixel, -1 outside of every area & on land when a water
+    mask is given"""
+    labels = np.full(shape, -1, dtype=np.int32)
+    for i, area in enumerate(areas):
+        if is_rectangle(area):
+            mask = np.zeros(shape, dtype=bool)
+            mask[area[1]:area[3], area[0]:area[2]] = True
+        else:
+            mask = np.zeros(shape, dtype=np.uint8)
+            cv.fillPoly(mask, [np.array(area, dtype=np.int32)], 1)
+            mask = mask.astype(bool)
+        # A pixel can only be in 1 area, otherwise the later area would quietly take it from the earlier one
+        if (labels[mask] >= 0).any():
+            raise ValueError('Search area {} overlaps search area {}'.format(i + 1, labels[mask].max() + 1))
+        labels[mask] = i
+    if water is not None:
+        labels[~water] = -1
+    return labels
+
+
+def grid_areas(region, rows, cols):
+    """Return the corners of rows x cols grid cells splitting region (UL-X, UL-Y, LR-X, LR-Y) into search areas"""
+    xs = np.linspace(region[0], region[2], cols + 1).astype(int)
+    ys = np.linspace(region[1], region[3], rows + 1).astype(int)
+    return [(xs[c], ys[r], xs[c + 1], ys[r + 1]) for r in range(rows) for c in range(cols)]
+
+
+# Part 6c - Menu options, 1 to n search area n twice, then every pair of areas in order (1 & 2, 1 & 3, ... 2 & 3 ...)
+def num_options(num_areas):
+    """Return the number of search choices on the menu"""
+    return num_areas + num_areas * (num_areas - 1) // 2
+
+
+def option_to_areas(choice, num_areas):
+    """Return the 2 areas (0 based) searched by menu choice(s), the same area twice for the first num_areas choices"""
+    n = num_areas
+    # Plain ints for the interactive game's single choice, numpy is only worth it for arrays of choices
+    if np.ndim(choice) == 0:
+        k = int(choice) - 1
+        if k < n:
+            return k, k
+        pair = k - n
+        a = 0
+        while pair >= n - a - 1:
+            pair -= n - a - 1
+            a += 1
+        return a, a + 1 + pair
+    k = np.asarray(choice) - 1
+    pair = np.maximum(k - n, 0)
+    # Pairs before row a are a * n - a * (a + 1) / 2, invert that to find the first area of the pair
+    a = np.floor(((2 * n - 1) - np.sqrt(np.maximum((2 * n - 1)**2 - 8 * pair, 0))) / 2).astype(np.int64)
+    # Floating point can land a row off, step back into the row that holds the pair
+    a = np.where(a * n - a * (a + 1) // 2 > pair, a - 1, a)
+    a = np.where((a + 1) * n - (a + 1) * (a + 2) // 2 <= pair, a + 1, a)
+    b = pair - (a * n - a * (a + 1) // 2) + a + 1
+    double = k < n
+    return np.where(double, k, a), np.where(double, k, b)
+
+
+def areas_to_option(area_1, area_2, num_areas):
+    """Return the menu choice that searches areas area_1 & area_2 (0 based, equal for searching an area twice)"""
+    a = np.minimum(area_1, area_2)
+    b = np.maximum(area_1, area_2)
+    pair = a * num_areas - a * (a + 1) // 2 + (b - a - 1)
+    return np.where(a == b, a + 1, num_areas + 1 + pair)
+
+
+def check_option_numbering(max_areas=1000):
+    """Check that option_to_areas() & areas_to_option() invert each other for 1 to max_areas areas, scalar & array"""
+    for n in range(1, max_areas + 1):
+        choices = np.arange(1, num_options(n) + 1)
+        area_1, area_2 = option_to_areas(choices, n)
+        # Every option maps back to itself and every pair (a <= b) shows up exactly once
+        assert (areas_to_option(area_1, area_2, n) == choices).all(), 'round trip failed for {} areas'.format(n)
+        assert ((area_1 <= area_2) & (area_2 < n)).all(), 'area out of range for {} areas'.format(n)
+        # The pure Python path for a single choice has to agree with the closed form, every choice of a menu that
+        # gets listed and a spot check of the ends & middle past that
+        spots = choices if n <= 30 else set(choices[[0, n - 1, -1, len(choices) // 2]].tolist())
+        for choice in spots:
+            assert option_to_areas(choice, n) == (area_1[choice - 1], area_2[choice - 1]), \
+                'scalar & array differ for choice {} of {} areas'.format(choice, n)
+    print('Menu numbering checked for 1 to {} search areas'.format(max_areas))
+
+
+def draw_menu(search_num, num_areas=3, probs=None, seps=None):
+    """Print menu of choices for conducting search areas, & the best ways to send NUM_TEAMS teams out for this
+    round's probs & SEPs"""
     print('\nSearch {}'.format(search_num))
-    print(
-        """
-        Choose next areas to search:
-        0 - Quit
-        1 - Search Area 1 twice
-        2 - Search Area 2 twice
-        3 - Search Area 3 twice
-        4 - Search Areas 1 & 2
-        5 - Search Areas 1 & 3
-        6 - Search Areas 2 & 3
-        7 - Start Over
-        """
-    )
+    print('\n        Choose next areas to search:')
+    print('        0 - Quit')
+    num_choices = num_options(num_areas)
+    if num_choices <= 30:
+        for choice in range(1, num_choices + 1):
+            area_1, area_2 = option_to_areas(choice, num_areas)
+            if area_1 == area_2:
+                print('        {} - Search Area {} twice'.format(choice, area_1 + 1))
+            else:
+                print('        {} - Search Areas {} & {}'.format(choice, area_1 + 1, area_2 + 1))
+    else:
+        # Too many to list, describe the numbering instead
+        print('        1-{} - Search that Area twice'.format(num_areas))
+        print('        {}-{} - Search a pair of Areas (1 & 2, 1 & 3, ... then 2 & 3, ...)'.format(num_areas + 1,
+                                                                                             num_choices))
+    print('        {} - Start Over\n'.format(num_choices + 1))
+    if probs is not None and can_rank(num_areas, NUM_TEAMS):
+        print_top_allocations(probs, seps, NUM_TEAMS)
+        print()
+
+
+def format_probs(label, values):
+    """Return 'label1 = x, label2 = y, ...' for printing the probs or SEPs of every area"""
+    return ', '.join('{}{} = {:.3f}'.format(label, i + 1, v) for i, v in enumerate(values))
+
+
+# POD of every way to send the teams out, as 1 array operation
+def ranked_areas(num_areas, num_teams, top=TOP_ALLOCATIONS):
+    """Return how many of the areas with the highest pod the top allocations can use, moving a team from any other
+    area to 1 of them the allocation doesn't use is never worse, so the top few only need num_teams + top - 1 areas"""
+    return min(num_areas, num_teams + top - 1)
+
+
+def can_rank(num_areas, num_teams, top=TOP_ALLOCATIONS):
+    """Return True if every allocation of num_teams teams over the areas the top allocations use is few enough to
+    rank"""
+    areas = ranked_areas(num_areas, num_teams, top)
+    return comb(areas + num_teams - 1, num_teams) * areas <= MAX_ALLOCATION_CELLS
+
+
+def team_allocations(num_areas, num_teams):
+    """Return a (allocations, num_areas) array of how many teams each allocation sends to each area, for every way
+    to send num_teams teams over num_areas areas (several teams can search the same area)"""
+    key = (num_areas, num_teams)
+    if key not in ALLOCATION_CACHE:
+        areas = np.array(list(itertools.combinations_with_replacement(range(num_areas), num_teams)))
+        counts = np.zeros((len(areas), num_areas), dtype=np.int64)
+        np.add.at(counts, (np.arange(len(areas))[:, None], areas), 1)
+        ALLOCATION_CACHE[key] = counts
+    return ALLOCATION_CACHE[key]
+
+
+def allocation_pods(p, sep, counts):
+    """Return the pod of every allocation (rows of counts), c searches of an area detect with 1 - (1 - pod)^c"""
+    pod = np.asarray(p, dtype=float) * np.asarray(sep, dtype=float)
+    # Pod of every area for 0 up to the most teams any allocation sends it, then look up each allocation's counts
+    pod_by_count = 1 - (1 - pod[:, None])**np.arange(counts.max() + 1)
+    return pod_by_count[np.arange(len(pod)), counts].sum(axis=1)
+
+
+def top_allocations(p, sep, num_teams, top=TOP_ALLOCATIONS):
+    """Return the team counts & pods of the top allocations of num_teams teams, highest pod first"""
+    p, sep = np.asarray(p, dtype=float), np.asarray(sep, dtype=float)
+    # Only the areas with the highest pod are ranked over, in map order so ties break the same as over every area
+    num_ranked = ranked_areas(len(p), num_teams, top)
+    ranked = np.arange(len(p))
+    if num_ranked < len(p):
+        ranked = np.sort(np.argpartition(-p * sep, num_ranked - 1)[:num_ranked])
+    ranked_counts = team_allocations(len(ranked), num_teams)
+    pods = allocation_pods(p[ranked], sep[ranked], ranked_counts)
+    # Only the top few need sorting, argpartition finds them without sorting every allocation
+    best = np.argpartition(-pods, top - 1)[:top] if top < len(pods) else np.arange(len(pods))
+    best = best[np.argsort(-pods[best], kind='stable')]
+    counts = np.zeros((len(best), len(p)), dtype=np.int64)
+    counts[:, ranked] = ranked_counts[best]
+    return counts, pods[best]
+
+
+def print_top_allocations(p, sep, num_teams, top=TOP_ALLOCATIONS, indent=' ' * 8):
+    """Print the best ways to send num_teams teams out this round"""
+    counts, pods = top_allocations(p, sep, num_teams, top)
+    print('{}Best ways to send {} teams:'.format(indent, num_teams))
+    for row, pod in zip(counts, pods):
+        areas = ', '.join('{} x{}'.format(area + 1, n) if n > 1 else str(area + 1) for area, n in enumerate(row) if n)
+        print('{} Areas {:<20} Probability of detection: {:.3f}'.format(indent, areas, pod))
+
+
+# Part 6d - Game logs
+def new_seed():
+    """Return a fresh seed for a game, small enough for np.random.seed()"""
+    return int(np.random.SeedSequence().generate_state(1)[0])
+
+
+def seed_game(seed):
+    """Seed np.random, a Search built after this plays the same game for the same seed & choices"""
+    np.random.seed(seed)
+
+
+def log_round(rounds, choice, found_1, found_2, probs):
+    """Add 1 round to a game log, the choice, both found flags & the target probs after it"""
+    rounds.append([int(choice), int(found_1), int(found_2), probs.tolist()])
+
+
+def save_game(seed, rounds, record_file=None):
+    """Append a game's log to record_file (RECORD_FILE by default), nothing is saved when it's None"""
+    record_file = record_file or RECORD_FILE
+    if record_file is None:
+        return
+    with open(record_file, 'a') as f:
+        f.write(json.dumps({'seed': seed, 'rounds': rounds}, separators=(',', ':')) + '\n')
+
+
+# Part 6e - Profiling the game loop
+@contextmanager
+def timed(phase):
+    """Add the time the with block takes to phase in PROFILE, does nothing when not profiling"""
+    if PROFILE is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PROFILE[phase] = PROFILE.get(phase, 0.0) + time.perf_counter() - start
+
+
+def print_profile():
+    """Print the time of each phase of the game that just ended & start the totals over"""
+    if not PROFILE:
+        return
+    total = sum(PROFILE.values())
+    print('\nTime per phase of the game (waiting for input left out):', file=sys.stderr)
+    for phase, seconds in sorted(PROFILE.items(), key=lambda item: -item[1]):
+        print('    {:<16}{:>10.2f} ms{:>8.1f}%'.format(phase, seconds * 1000, 100 * seconds / total), file=sys.stderr)
+    PROFILE.clear()
 
 
 # Part 7 - Define the main function used to run the program
-def main():
-    app = Search('Cape_Python')
-    # Display the map
-    app.draw_map(last_known=(160, 290))
-    sailor_x, sailor_y = app.sailor_final_location(num_search_areas=3)
-    sailor_y = int(sailor_y)
-    sailor_x = int(sailor_x)
-    print("-" * 65)
-    print("\nInitial Target (P) Probabilities:")
-    print("P1 = {:.3f}, P2 = {:.3f}, P3 = {:.3f}".format(app.p1, app.p2, app.p3))
-    # Keep track of how many searches have been conducted
-    search_num = 1
-
-    # For Challenge 1 add list that should keep track of each of the 3 search areas that have been searched
-    lst_coords_1 = []
-    lst_coords_2 = []
-    lst_coords_3 = []
-
-    # Part 8 - Evaluating the menu choices
+def main(seed=None):
+    # The planner imports this file, so it's only imported once the game starts
+    from sailorSearch_planner import PLAN_HORIZON, can_plan, plan_choices
+    # The map, labels & cells are only built once, every Start Over & every new game after a find reuses the Search
+    with timed('setup'):
+        app = Search('Cape_Python')
+    num_choices = num_options(app.num_areas)
+
     while True:
-        # Show the menu and have the user play the game
-        app.calc_search_effectiveness()
-        draw_menu(search_num)
-        choice = input('Choice: ')
-
-        # Choice to quite game
-        if choice == "0":
-            sys.exit()
-        # Choices 1-3
-        elif choice == "1":
-            results_1, coords_1 = app.conduct_search(1, app.sa1, app.sep1, lst_coords_1)
-            # Append the coords searched to the list
-            lst_coords_1.append(coords_1)
-            results_2, coords_2 = app.conduct_search(1, app.sa1, app.sep1, lst_coords_1)
-            # Append the coords searched to the list
-            lst_coords_1.append(coords_2)
-            # Determine overall sep for both searches on the same area
-            app.sep1 = (len(set(coords_1 + coords_2))) / (len(app.sa1)**2)
-            app.sep2 = 0
-            app.sep3 = 0
-        elif choice == "2":
-            results_1, coords_1 = app.conduct_search(2, app.sa2, app.sep2, lst_coords_2)
-            # Append the coords searched to the list
-            lst_coords_2.append(coords_1)
-            results_2, coords_2 = app.conduct_search(2, app.sa2, app.sep2, lst_coords_2)
-            # Append the coords searched to the list
-            lst_coords_2.append(coords_2)
-            app.sep1 = 0
-            # Determine overall sep for both searches on the same area
-            app.sep2 = (len(set(coords_1 + coords_2))) / (len(app.sa2) ** 2)
-            app.sep3 = 0
-        elif choice == "3":
-            results_1, coords_1 = app.conduct_search(3, app.sa3, app.sep3, lst_coords_3)
-            # Append the coords searched to the list
-            lst_coords_3.append(coords_1)
-            results_2, coords_2 = app.conduct_search(3, app.sa3, app.sep3, lst_coords_3)
-            # Append the coords searched to the list
-            lst_coords_3.append(coords_2)
-            app.sep1 = 0
-            app.sep2 = 0
-            # Determine overall sep for both searches on the same area
-            app.sep3 = (len(set(coords_1 + coords_2))) / (len(app.sa3) ** 2)
-        # Choices 4-6 mean the search teams will search 2 areas so no need to recalculate SEP
-        elif choice == "4":
-            results_1, coords_1 = app.conduct_search(1, app.sa1, app.sep1, lst_coords_1)
-            lst_coords_1.append(coords_1)
-            results_2, coords_2 = app.conduct_search(2, app.sa2, app.sep2, lst_coords_2)
-            lst_coords_2.append(coords_2)
-            app.sep3 = 0
-        elif choice == "5":
-            results_1, coords_1 = app.conduct_search(1, app.sa1, app.sep1, lst_coords_1)
-            lst_coords_1.append(coords_1)
-            results_2, coords_2 = app.conduct_search(3, app.sa3, app.sep3, lst_coords_3)
-            lst_coords_3.append(coords_2)
-            app.sep2 = 0
-        elif choice == "6":
-            results_1, coords_1 = app.conduct_search(3, app.sa3, app.sep3, lst_coords_3)
-            lst_coords_3.append(coords_1)
-            results_2, coords_2 = app.conduct_search(2, app.sa2, app.sep2, lst_coords_2)
-            lst_coords_2.append(coords_2)
-            app.sep1 = 0
-        # Reset game and clear map
-        elif choice == "7":
-            main()
-        # Handle invalid input
-        else:
-            print('That is not a valid choice.', file=sys.stderr)
-            continue
-
-        # Part 9 - Finishing and calling main
-        # Use Bayes' Rule to update target probs
-        app.revise_target_probs()
-
-        print("\nSearch {} Results 1 = {}".format(search_num, results_1), file=sys.stderr)
-        print("\nSearch {} Results 2 = {}".format(search_num, results_2), file=sys.stderr)
-        print("Search {} Effectiveness (E):".format(search_num))
-        print("E1 = {:.3f}, E2 = {:.3f}, E3 = {:.3f}".format(app.sep1, app.sep2, app.sep3))
-
-        # If both searches fail display the updated probabilities
-        if results_1 == "Not Found" and results_2 == "Not Found":
-            print("\nNew Target Probabilities (P) for Search {}".format(search_num + 1))
-            print("p1 = {:.3f}, P2 = {:.3f}, P3 = {:.3f}".format(app.p1, app.p2, app.p3))
-        else:
-            cv.circle(app.img, (sailor_x, sailor_y), 3, (255, 0, 0), -1)
-            cv.imshow("search Area", app.img)
-            cv.waitKey(1500)
-            main()
-        search_num += 1
+        # Every game gets its own seed so its log can be replayed by sailorSearch_replay.py
+        seed = new_seed() if seed is None else seed
+        seed_game(seed)
+        rounds = []
+        # Put the search draws & the cursors back to a new game, the same start sailorSearch_replay.py gives it
+        with timed('setup'):
+            app.reseed()
+            app.reset()
+        # Display the map
+        with timed('drawing'):
+            app.draw_map(last_known=(160, 290))
+        with timed('sailor location'):
+            sailor_x, sailor_y = app.sailor_final_location(num_search_areas=app.num_areas)
+        print("-" * 65)
+        print("\nInitial Target (P) Probabilities:")
+        print(format_probs('P', app.probs))
+        land = np.flatnonzero(app.sizes == 0) + 1
+        if len(land):
+            print("Search Areas {} are all land, the sailor can't be there".format(', '.join(map(str, land))))
+        # Keep track of how many searches have been conducted
+        search_num = 1
+
+        # Part 8 - Evaluating the menu choices
+        while True:
+            # Show the menu and have the user play the game
+            with timed('SEP draws'):
+                app.calc_search_effectiveness()
+            draw_menu(search_num, app.num_areas, app.probs, app.seps)
+            # Offer the lookahead planner's pick when there are few enough areas to plan over
+            if can_plan(app.num_areas):
+                with timed('planner'):
+                    suggestion = plan_choices(np.array([app.probs]), np.array([app.seps]), PLAN_HORIZON)[0]
+                print('        Planner suggests {} (looking {} searches ahead)\n'.format(suggestion, PLAN_HORIZON))
+            choice = input('Choice: ')
+            # Handle invalid input, asking again keeps this round's SEPs so a game log replays the same draws
+            while not (choice.isdigit() and 0 <= int(choice) <= num_choices + 1):
+                print('That is not a valid choice.', file=sys.stderr)
+                choice = input('Choice: ')
+            choice = str(int(choice))
+
+            # Choice to quite game
+            if choice == "0":
+                print_profile()
+                save_game(seed, rounds)
+                sys.exit()
+            # Reset game and clear map
+            elif choice == str(num_choices + 1):
+                print_profile()
+                save_game(seed, rounds)
+                break
+            # Every other valid choice runs the 2 searches for the chosen areas
+            else:
+                with timed('searches'):
+                    results_1, results_2, found_1, found_2 = app.search_choice(choice)
+
+            # Part 9 - Finishing and starting the next game
+            # Use Bayes' Rule to update target probs & the pixel map
+            with timed('target probs'):
+                app.revise_target_probs()
+            with timed('pixel map'):
+                app.revise_posterior()
+            log_round(rounds, choice, found_1, found_2, app.probs)
+
+            print("\nSearch {} Results 1 = {}".format(search_num, results_1), file=sys.stderr)
+            print("\nSearch {} Results 2 = {}".format(search_num, results_2), file=sys.stderr)
+            print("Search {} Effectiveness (E):".format(search_num))
+            print(format_probs('E', app.seps))
+
+            # If both searches fail display the updated probabilities
+            if not found_1 and not found_2:
+                print("\nNew Target Probabilities (P) for Search {}".format(search_num + 1))
+                print(format_probs('P', app.probs))
+                print("Pixel Map Probabilities (P) from the cells searched so far:")
+                with timed('pixel map'):
+                    pixel_probs = app.posterior_area_probs()
+                print(format_probs('P', pixel_probs))
+            else:
+                with timed('drawing'):
+                    cv.circle(app.img, (sailor_x, sailor_y), 3, (255, 0, 0), -1)
+                    show_map(app.img, 1500)
+                print_profile()
+                save_game(seed, rounds)
+                break
+            search_num += 1
+        # The next game draws a fresh seed
+        seed = None
 
 
 """Challenges:
@@ -320,6 +810,15 @@ def main():
     
         Current idea is to hold the coords for each search area and add as parameter to conduct_search() method. Then
         check for duplicates while running the search and reroll if a duplicate occurs. 
+        
+        Update - The lists of coordinate tuples got slower every round, so each area now has a numpy boolean mask of
+        the searched cells and conduct_search() just picks from the False cells, same cost on round 50 as round 1.
+
+        Update 2 - Scanning the mask is still O(area) per search, which hurts with 1000x1000 pixel areas. Each area now
+        keeps a shuffle of its cells with a cursor, a search moves the cells it picks up to the cursor in O(cells
+        picked) and Start Over keeps the same Search, reseed() & reset() put the shuffle & cursors back without
+        rebuilding the labels or cells. The history of each area is a packed bitset (1 bit a cell), every search is
+        unioned into it and "whole area searched" is a popcount.
     
     Challenge 2 - Run Monte Carlo Simulation to determine if it is better to a) choose menu item 1-3 based on the 
     highest prob or b) choose items 4-6 based on highest combined target probs. Run each group 10,000 times and output
@@ -332,4 +831,20 @@ def main():
 
 # Run main
 if __name__ == '__main__':
-    main()
+    # Play in the terminal only, no map window
+    if '--headless' in sys.argv[1:]:
+        HEADLESS = True
+    # Append every game to a log that sailorSearch_replay.py can play back
+    if '--record' in sys.argv[1:-1]:
+        RECORD_FILE = sys.argv[sys.argv.index('--record') + 1]
+    # Print the time each phase of a game took when it ends
+    if '--profile' in sys.argv[1:]:
+        PROFILE = {}
+    # Rank the ways to send N teams out under the menu
+    if '--teams' in sys.argv[1:-1]:
+        NUM_TEAMS = int(sys.argv[sys.argv.index('--teams') + 1])
+    # Check the menu numbering instead of playing
+    if '--check-options' in sys.argv[1:]:
+        check_option_numbering()
+    else:
+        main()
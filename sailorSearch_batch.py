@@ -0,0 +1,159 @@
+"""
+Batch version of the sailor search Monte Carlo simulation. Instead of playing one Python level game at a time, the
+per game state of Search (probs, seps, area_actual & how much of each area is left to search) is kept as (games, areas)
+numpy arrays, so one round of the strategy choice & revise_target_probs() runs for every game at once. Games drop
+out of the arrays as soon as the sailor is found.
+
+Detection doesn't need the pixel masks: the sailor's cell is still unsearched if he/she hasn't been found, and
+conduct_search() picks its cells uniformly from the unsearched ones, so picking m of the k unsearched cells finds the
+sailor with probability m / k. Only the unsearched count per area is tracked, which gives the same distribution of
+searches as the full game.
+"""
+import time
+import argparse
+import numpy as np
+from sailorSearch import (PRIORS, option_to_areas, area_sizes, cumulative_table, sample_index, sep_from_uniform,
+                          log_bayes_update)
+from sailorSearch_strategies import STRATEGIES
+from sailorSearch_planner import set_plan_sep_dist
+
+# Part 1 - Constants
+# Number of water cells in each of the default search areas, the cells the game's Search plays on
+AREA_SIZES = area_sizes()
+
+# Number of games to play for each strategy
+NUM_SIMULATIONS = 1000000
+
+
+# Part 2 - Random draws shared by every strategy
+def uniform_draws(seed, key, shape, antithetic=False):
+    """Return uniform [0, 1) draws for every game keyed by (seed, key), the 2nd half mirrors the 1st if antithetic"""
+    # Each key has its own stream, so game i always sees the same draws whatever strategy or games are still running
+    rng = np.random.default_rng([seed, key])
+    if not antithetic:
+        return rng.random(shape)
+    # Antithetic pairs - game i + half gets 1 - u of game i
+    half = rng.random(((shape[0] + 1) // 2,) + shape[1:])
+    return np.concatenate((half, 1 - half))[:shape[0]]
+
+
+def round_draws(seed, search_num, num_games, num_areas=3, antithetic=False, sep_dist='uniform'):
+    """Return the SEPs & detection draws of every game for one round, the same for any strategy with the same seed"""
+    # A higher SEP or a lower detection draw always finds the sailor sooner, so mirroring both pulls the pair apart
+    sep_u = uniform_draws(seed, 2 * search_num - 1, (num_games, num_areas), antithetic)
+    detect_u = uniform_draws(seed, 2 * search_num, (num_games,), antithetic)
+    return sep_from_uniform(sep_u, sep_dist), detect_u
+
+
+# Part 3 - One round of searches for every game at once
+def search_round(log_p, p, sep, unsearched, choice, sizes=AREA_SIZES):
+    """Run the 2 searches of every game's choice, return the revised log target probs & target probs, the areas
+    searched & the cells covered
+
+    unsearched (games, areas), log_p & p are updated in place, the rows of sep & choice line up with them.
+    """
+    rows = np.arange(len(log_p))
+    first, second = option_to_areas(choice, log_p.shape[1])
+    # Cells each team can cover, trimmed to what is left of the area just like conduct_search()
+    lst_len_1 = (sizes[first] * sep[rows, first]).astype(np.int64)
+    lst_len_2 = (sizes[second] * sep[rows, second]).astype(np.int64)
+    covered_1 = np.minimum(lst_len_1, unsearched[rows, first])
+    # The second team sees what the first one left when both search the same area
+    left = unsearched[rows, second] - np.where(first == second, covered_1, 0)
+    covered_2 = np.minimum(lst_len_2, left)
+    np.subtract.at(unsearched, (rows, first), covered_1)
+    np.subtract.at(unsearched, (rows, second), covered_2)
+
+    # Double searches use the overall sep of both searches, pairs keep the drawn sep and every other area is 0
+    double = first == second
+    searched_sep = np.zeros_like(sep)
+    searched_sep[rows, first] = sep[rows, first]
+    searched_sep[rows, second] = sep[rows, second]
+    searched_sep[double, first[double]] = (covered_1 + covered_2)[double] / np.maximum(sizes[first[double]], 1)
+    # An area with nothing left to search can't be hiding the sailor anymore
+    searched_sep[unsearched == 0] = 1
+
+    # Use Bayes' Rule to update target probs of every game at once, same update as revise_target_probs()
+    log_p, p = log_bayes_update(log_p, p, searched_sep)
+    return log_p, p, first, second, covered_1, covered_2
+
+
+# Part 4 - Play every game in lockstep
+def simulate_batch(strategy, num_games, seed=None, antithetic=False, sep_dist='uniform', sizes=AREA_SIZES,
+                   priors=PRIORS, unsearched=None, first_choice=None, first_sep=None):
+    """Return an array with the number of searches each of num_games games took using strategy
+
+    Games i and i + (num_games + 1) // 2 are an antithetic pair when antithetic is True, they use mirrored SEP &
+    detection draws. sizes & priors give the cell count & pre search prob of every search area.
+
+    To play on from a game in progress pass its target probs as priors & the cells each area has left as unsearched,
+    the sailor is then in an area with cells left & uniform over them. first_choice & first_sep play the 1st round
+    with that choice at those SEPs (the ones already drawn) before strategy takes over.
+    """
+    # Pick a seed when none is given, every draw below is keyed by it
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    sizes = np.asarray(sizes)
+    num_areas = len(sizes)
+    # Strategies that look ahead need to know how the SEPs of later rounds are drawn
+    set_plan_sep_dist(sep_dist)
+    num_searches = np.zeros(num_games, dtype=np.int64)
+
+    # Per game state, 1 row per game still being played
+    game_ids = np.arange(num_games)
+    p = np.tile(np.array(priors, dtype=float), (num_games, 1))
+    with np.errstate(divide='ignore'):
+        log_p = np.log(p)
+    unsearched = np.tile(sizes if unsearched is None else np.asarray(unsearched), (num_games, 1))
+    # Choose a search area from the priors, same as Search.sailor_final_location() since each area's prior is spread
+    # evenly over its cells. The area isn't mirrored, 1 - u would move the pair's sailors apart rather than together
+    u = uniform_draws(seed, 0, (num_games,))
+    area_actual = sample_index(cumulative_table(np.asarray(priors, dtype=float) * (unsearched[0] > 0)), u)
+
+    search_num = 1
+    while len(game_ids) > 0:
+        rows = np.arange(len(game_ids))
+        # calc_search_effectiveness() for every game
+        sep_draws, detect_draws = round_draws(seed, search_num, num_games, num_areas, antithetic, sep_dist)
+        if search_num == 1 and first_choice is not None:
+            sep = np.tile(np.asarray(first_sep, dtype=float), (len(game_ids), 1))
+            choice = np.full(len(game_ids), first_choice)
+        else:
+            sep = sep_draws[game_ids]
+            choice = strategy(p, sep)
+        # The sailor's cell is uniform over the unsearched cells of its area, so m of k cells finds it with prob m / k
+        left_in_area = unsearched[rows, area_actual]
+        log_p, p, first, second, covered_1, covered_2 = search_round(log_p, p, sep, unsearched, choice, sizes)
+        in_area = np.where(first == area_actual, covered_1, 0) + np.where(second == area_actual, covered_2, 0)
+        found = detect_draws[game_ids] * np.maximum(left_in_area, 1) < in_area
+
+        # Record the finished games and mask them out of the state arrays
+        num_searches[game_ids[found]] = search_num
+        keep = ~found
+        game_ids = game_ids[keep]
+        log_p = log_p[keep]
+        p = p[keep]
+        unsearched = unsearched[keep]
+        area_actual = area_actual[keep]
+        search_num += 1
+    return num_searches
+
+
+# Part 5 - Define the main function used to run the program
+def main():
+    parser = argparse.ArgumentParser(description='Lockstep batch simulation of the search strategies')
+    parser.add_argument('--games', type=int, default=NUM_SIMULATIONS, help='games per strategy')
+    parser.add_argument('--seed', type=int, default=None, help='seed for reproducible runs')
+    args = parser.parse_args()
+
+    for name, strategy in STRATEGIES.items():
+        start = time.perf_counter()
+        num_searches = simulate_batch(strategy, args.games, args.seed)
+        elapsed = time.perf_counter() - start
+        print("Average search for %d simulations %s: %.3f (%.2f seconds)" % (args.games, name,
+                                                                              num_searches.mean(), elapsed))
+
+
+# Run main
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmarks of the hot paths of the sailor search engine. For every area side in AREA_SIDES (50x50 up to 2000x2000
+pixel areas) a blank map is made with 3 square areas side by side, and the suite times building the Search, placing
+the sailor, a search at the start & deep into a game, the target prob & pixel map updates, drawing the map and, once,
+every strategy's choice. A 2nd pass under tracemalloc measures the peak memory of building & playing each size.
+
+The results go to a JSON file so runs before & after a change can be compared, and a table is printed. The per phase
+times of a played game come from sailorSearch.py --profile instead.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import numpy as np
+import cv2 as cv
+import sailorSearch
+from sailorSearch import Search, BASE_LAYER_CACHE, PRIORS
+from sailorSearch_strategies import STRATEGIES
+
+# Part 1 - Constants
+# Side in pixels of each of the 3 square search areas
+AREA_SIDES = (50, 100, 250, 500, 1000, 2000)
+
+# Rounds into a game the searches are timed at, each round searches every area once
+ROUND_COUNTS = (1, 10, 40)
+
+# SEP of every benchmark search, small enough that 40 rounds don't finish an area
+BENCH_SEP = 0.01
+
+# Repeats of the cheap calls to average over
+REPEATS = 200
+
+# Pixels of map around the areas
+MARGIN = 10
+
+# Where the results are written
+RESULTS_FILE = 'bench_results.json'
+
+
+# Part 2 - Maps to benchmark on
+def bench_map(side, folder):
+    """Write a blank map with room for 3 side x side areas & return its file and the areas"""
+    map_file = os.path.join(folder, 'bench_%d.png' % side)
+    if not os.path.exists(map_file):
+        cv.imwrite(map_file, np.full((side + 2 * MARGIN, 3 * side + 4 * MARGIN, 3), 255, dtype=np.uint8))
+    areas = [(MARGIN + i * (side + MARGIN), MARGIN, MARGIN + i * (side + MARGIN) + side, MARGIN + side)
+             for i in range(3)]
+    return map_file, areas
+
+
+def mean_time(func, repeats=REPEATS):
+    """Return the average seconds func() takes"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+# Part 3 - Time each hot path
+def bench_size(side, folder):
+    """Return a dict of the seconds each hot path takes for 3 side x side areas"""
+    map_file, areas = bench_map(side, folder)
+    results = {'side': side, 'cells': 3 * side * side}
+    start = time.perf_counter()
+    app = Search('Bench', areas=areas, priors=PRIORS, verbose=False, map_file=map_file)
+    results['build'] = time.perf_counter() - start
+    results['sailor_final_location'] = mean_time(app.sailor_final_location)
+
+    # Searches get timed in the round each round count names, the rounds in between just play
+    app.reset()
+    played = 0
+    for rounds in ROUND_COUNTS:
+        while played < rounds - 1:
+            for area in range(app.num_areas):
+                app.conduct_search(area + 1, BENCH_SEP)
+            played += 1
+        start = time.perf_counter()
+        for area in range(app.num_areas):
+            app.conduct_search(area + 1, BENCH_SEP)
+        results['conduct_search_round_%d' % rounds] = (time.perf_counter() - start) / app.num_areas
+        played += 1
+
+    app.seps = np.full(app.num_areas, BENCH_SEP)
+    results['revise_target_probs'] = mean_time(app.revise_target_probs)
+    # The pixel map is built the 1st time, time the updates after that
+    app.revise_posterior()
+    results['revise_posterior'] = mean_time(app.revise_posterior, repeats=10)
+    # Drawing, cold builds the annotated base layer once, warm is the copy each game gets
+    BASE_LAYER_CACHE.clear()
+    start = time.perf_counter()
+    app.draw_map(last_known=(MARGIN, MARGIN))
+    results['draw_map_cold'] = time.perf_counter() - start
+    results['draw_map_warm'] = mean_time(lambda: app.draw_map(last_known=(MARGIN, MARGIN)), repeats=10)
+    BASE_LAYER_CACHE.clear()
+    return results
+
+
+def bench_memory(side, folder):
+    """Return the peak bytes allocated building a Search of 3 side x side areas & playing 10 rounds on it"""
+    map_file, areas = bench_map(side, folder)
+    sailorSearch.MAP_CACHE.clear()
+    sailorSearch.WATER_CACHE.clear()
+    tracemalloc.start()
+    app = Search('Bench', areas=areas, priors=PRIORS, verbose=False, map_file=map_file)
+    app.sailor_final_location()
+    for _ in range(10):
+        for area in range(app.num_areas):
+            app.conduct_search(area + 1, BENCH_SEP)
+        app.seps = np.full(app.num_areas, BENCH_SEP)
+        app.revise_target_probs()
+        app.revise_posterior()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    sailorSearch.MAP_CACHE.clear()
+    sailorSearch.WATER_CACHE.clear()
+    return peak
+
+
+def bench_strategies():
+    """Return the seconds each strategy takes to pick 1 choice, the planner's tables are solved before timing"""
+    p = np.array(PRIORS, dtype=float)
+    sep = np.full(len(PRIORS), 0.5)
+    results = {}
+    for name, strategy in STRATEGIES.items():
+        strategy(p[None, :], sep[None, :])
+        results[name] = mean_time(lambda: strategy(p[None, :], sep[None, :]))
+    return results
+
+
+# Part 4 - Run the suite
+def print_results(report):
+    """Print a table of the timings in ms & the peak memory in MB for each size"""
+    names = [name for name in report['sizes'][0] if name not in ('side', 'cells', 'peak_bytes')]
+    print("{:>26}".format('Area side') + ''.join("{:>11d}".format(row['side']) for row in report['sizes']))
+    for name in names:
+        print("{:>26}".format(name + ' ms') + ''.join("{:>11.3f}".format(row[name] * 1000) for row in report['sizes']))
+    print("{:>26}".format('peak MB') + ''.join("{:>11}".format('-') if row['peak_bytes'] is None else
+                                                "{:>11.1f}".format(row['peak_bytes'] / 2**20) for row in report['sizes']))
+    for name, seconds in report['strategies'].items():
+        print("{:>26}{:>11.1f}".format('choose %s us' % name, seconds * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks of the hot paths of the search engine')
+    parser.add_argument('--sides', type=int, nargs='+', default=list(AREA_SIDES), help='area sides in pixels')
+    parser.add_argument('--out', default=RESULTS_FILE, help='JSON file to write the results to')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    args = parser.parse_args()
+    # Time the drawing without ever opening a window
+    sailorSearch.HEADLESS = True
+
+    report = {'python': platform.python_version(), 'numpy': np.__version__, 'opencv': cv.__version__,
+              'sizes': [], 'strategies': bench_strategies()}
+    with tempfile.TemporaryDirectory() as folder:
+        for side in args.sides:
+            results = bench_size(side, folder)
+            results['peak_bytes'] = None if args.no_memory else bench_memory(side, folder)
+            report['sizes'].append(results)
+            print("Area side %d done" % side, file=sys.stderr)
+            # Drop the map so the next size doesn't carry it
+            sailorSearch.MAP_CACHE.clear()
+            sailorSearch.WATER_CACHE.clear()
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_results(report)
+    print("Results written to %s" % args.out)
+
+
+# Run main
+if __name__ == '__main__':
+    main()
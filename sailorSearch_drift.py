@@ -0,0 +1,96 @@
+"""
+Drift model for the sailor search game. The sailor doesn't have to stay put between rounds: wind & current carry
+him/her DRIFT pixels a round on average, scattered by SPREAD pixels. Between 2 rounds of searches the pixel map of
+where the sailor could be is moved on the same way, by convolving it with the drift kernel, a Gaussian around the
+drift vector. The kernel is separable, so the convolution is a 1D pass along x & one along y (cv.sepFilter2D) and only
+over the box around the search areas, the cost per round stays small on full resolution maps.
+
+The sailor is only ever in a search area, so probability carried out of the areas is dropped and the map renormalized,
+and a move that would take the sailor out of the areas is drawn again. After a drift a searched cell can hold the
+sailor again once probability has flowed back into it, so the search history of every area is rebuilt from the map:
+a cell counts as searched while its probability is still 0. Drifting also swaps the belief model, the target probs
+come off the pixel map instead of the SEP based Bayes updates. With no drift & no spread the kernel is the identity,
+so advance() does nothing at all (no draws, no map) and the game plays exactly like the one without drift.
+"""
+import numpy as np
+import cv2 as cv
+
+# Part 1 - Constants
+# Average (x, y) pixels the sailor is carried each round
+DRIFT = (1.0, 0.5)
+
+# Pixels of scatter around the drift each round
+SPREAD = 1.0
+
+# The kernel reaches this many SPREADs past the drift
+KERNEL_SIGMAS = 3
+
+# Draws of a move before giving up on keeping the sailor in the areas & leaving him/her put
+MAX_MOVE_TRIES = 100
+
+
+# Part 2 - The drift kernel
+def drift_kernel(shift, spread=SPREAD):
+    """Return the offsets & probs of moving along 1 axis, centred on 0 so the middle entry is no move"""
+    radius = int(np.ceil(abs(shift) + KERNEL_SIGMAS * spread))
+    offsets = np.arange(-radius, radius + 1)
+    if spread > 0:
+        weights = np.exp(-0.5 * ((offsets - shift) / spread)**2)
+    else:
+        # No scatter, split the move between the 2 nearest whole pixels
+        weights = np.maximum(1 - np.abs(offsets - shift), 0)
+    return offsets, weights / weights.sum()
+
+
+# Part 3 - Move the sailor & the pixel map on 1 round
+class Drift():
+    """Drift of the sailor & the belief map of a Search game between rounds"""
+    def __init__(self, app, drift=DRIFT, spread=SPREAD):
+        self.offsets_x, self.weights_x = drift_kernel(drift[0], spread)
+        self.offsets_y, self.weights_y = drift_kernel(drift[1], spread)
+        # Both kernels are just "no move", nothing ever drifts
+        self.still = len(self.offsets_x) == 1 and len(self.offsets_y) == 1
+        # The box around the search areas, no probability ever lives outside it
+        ys, xs = np.unravel_index(app.cells, app.labels.shape)
+        self.box = (slice(ys.min(), ys.max() + 1), slice(xs.min(), xs.max() + 1))
+        self.outside = app.labels[self.box] < 0
+
+    def move_sailor(self, app):
+        """Carry the sailor by 1 draw from the drift kernel, drawn again while it would take him/her out of the areas"""
+        height, width = app.labels.shape
+        for _ in range(MAX_MOVE_TRIES):
+            x = app.sailor_actual[0] + app.rng.choice(self.offsets_x, p=self.weights_x)
+            y = app.sailor_actual[1] + app.rng.choice(self.offsets_y, p=self.weights_y)
+            if 0 <= x < width and 0 <= y < height and app.labels[y, x] >= 0:
+                app.sailor_actual = [int(x), int(y)]
+                app.sailor_cell = int(y) * width + int(x)
+                app.area_actual = int(app.labels[y, x]) + 1
+                return
+
+    def rebuild_history(self, app):
+        """Mark the cells the map says can't hold the sailor as searched & every other cell as unsearched"""
+        for area in range(app.num_areas):
+            start, end = app.starts[area], app.starts[area + 1]
+            empty = app.posterior[app.cells[start:end]] == 0
+            app.searched_bits[area] = np.packbits(empty, bitorder='little')
+            app.unsearched[area] = len(empty) - np.count_nonzero(empty)
+            # Searched cells before the area's cursor & the rest after it, the draws are uniform so no shuffle needed
+            app.order[start:end] = start + np.concatenate((np.flatnonzero(empty), np.flatnonzero(~empty)))
+
+    def advance(self, app):
+        """Move the sailor & the pixel map 1 round on, call it after the round's searches have been revised"""
+        if self.still:
+            return
+        self.move_sailor(app)
+        # Fold this round's searches into the pixel map before moving it
+        app.revise_posterior()
+        grid = app.posterior.reshape(app.labels.shape)[self.box]
+        # sepFilter2D correlates, flipping the kernels makes it push the map along the drift
+        moved = cv.sepFilter2D(grid, cv.CV_64F, self.weights_x[::-1].copy(), self.weights_y[::-1].copy(),
+                               borderType=cv.BORDER_CONSTANT)
+        moved[self.outside] = 0
+        total = moved.sum()
+        grid[...] = moved / total if total > 0 else moved
+        # Searched cells the sailor could have drifted into are searchable again, & the target probs come off the map
+        self.rebuild_history(app)
+        app.set_target_probs(app.posterior_area_probs())
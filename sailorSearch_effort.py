@@ -0,0 +1,121 @@
+"""
+Optimal split of a search effort budget over the search areas, in the style of Koopman's search theory. The menu only
+sends whole teams, search theory spreads a continuous effort (track length, team hours ...) instead. With random
+search the chance that effort z in area i finds the sailor, if he/she is there, is the exponential detection function
+
+    POD_i(z) = 1 - exp(-a_i * z),  a_i = sweep width_i / area size_i
+
+and the split that finds the sailor with the highest prob, maximizing sum p_i * POD_i(z_i) with the z_i adding up to
+the budget Z, has a closed form. Every area that gets effort ends at the same marginal detection rate lambda, so
+
+    z_i = max(0, log(p_i * a_i / lambda) / a_i)
+
+and the areas that get effort are always the ones with the highest p_i * a_i. Sorting the areas by that, adding them
+1 at a time & solving for lambda with a running sum finds the split in O(areas log areas), for every game of a batch
+at once, milliseconds for a batch of hundreds of areas.
+
+The 'effort' strategy in sailorSearch_strategies.py uses the solver on the game: 1 team searching area i this round
+detects with prob SEP_i, which is POD_i(1) with a_i = -log(1 - SEP_i). It splits the 2 teams of the menu & rounds the
+split to the nearest whole teams.
+
+Running this file prints the split for the priors of the default game & a benchmark of the solver as the areas grow.
+"""
+import time
+import argparse
+import numpy as np
+from sailorSearch import PRIORS, SEP_LOW, SEP_HIGH
+from sailorSearch_planner import snap_to_grid
+
+# Part 1 - Constants
+# Teams the menu of the game sends out every round
+MENU_TEAMS = 2
+
+# Numbers of areas the benchmark times the solver for
+BENCH_AREAS = (3, 10, 100, 300, 1000)
+
+# Games solved at once by the benchmark
+BENCH_GAMES = 100
+
+# Solves to average the benchmark over
+BENCH_REPEATS = 20
+
+
+# Part 2 - The solver
+def detection_rates(sweep_widths, area_sizes):
+    """Return a, the rate each unit of effort detects at in every area, its sweep width over its size"""
+    return np.asarray(sweep_widths, dtype=float) / np.asarray(area_sizes, dtype=float)
+
+
+def optimal_effort(p, rates, effort):
+    """Return the split of effort over the areas that finds the sailor with the highest prob
+
+    p & rates (the a of detection_rates()) are the target probs & detection rates of 1 game, or (games, areas) arrays
+    of a batch, effort is the budget of every game. The split comes back the same shape as p & adds up to effort.
+    """
+    p = np.asarray(p, dtype=float)
+    p_2d, rates = np.broadcast_arrays(np.atleast_2d(p), np.atleast_2d(np.asarray(rates, dtype=float)))
+    rows = np.arange(len(p_2d))[:, None]
+    with np.errstate(divide='ignore'):
+        # Detection rate of the 1st unit of effort in every area, -inf for an area that can't find the sailor
+        log_rate = np.log(p_2d * rates)
+    usable = np.isfinite(log_rate)
+    inv_rates = np.where(usable, 1 / np.where(usable, rates, 1), 0)
+    # Best areas 1st, with the best k areas getting effort log(lambda) = (sum log rate / a - effort) / sum 1 / a
+    order = np.argsort(-log_rate, axis=1, kind='stable')
+    sorted_rate = log_rate[rows, order]
+    sorted_inv = inv_rates[rows, order]
+    total_inv = np.cumsum(sorted_inv, axis=1)
+    weighted = np.where(sorted_inv > 0, np.where(np.isfinite(sorted_rate), sorted_rate, 0) * sorted_inv, 0)
+    log_lambda = (np.cumsum(weighted, axis=1) - effort) / np.where(total_inv > 0, total_inv, 1)
+    # An area gets effort while its 1st unit beats lambda of the areas before it, always a run of the best areas
+    active = np.count_nonzero(sorted_rate > log_lambda, axis=1)
+    log_lambda = log_lambda[rows[:, 0], np.maximum(active, 1) - 1][:, None]
+    with np.errstate(invalid='ignore'):
+        split = np.where(usable & (active[:, None] > 0), np.maximum((log_rate - log_lambda) * inv_rates, 0), 0)
+    return split.reshape(p.shape)
+
+
+def effort_pod(p, rates, split):
+    """Return the prob the split of effort finds the sailor, sum of p_i * (1 - exp(-a_i * z_i)) over the areas"""
+    return (np.asarray(p) * -np.expm1(-np.asarray(rates) * split)).sum(axis=-1)
+
+
+def team_counts(split, teams):
+    """Return the whole teams closest to a split of teams worth of effort, rounded by largest remainder"""
+    split = np.atleast_2d(split)
+    return snap_to_grid(split / np.maximum(split.sum(axis=1, keepdims=True), 1e-300), teams)
+
+
+# Part 3 - Benchmark the solver
+def main():
+    parser = argparse.ArgumentParser(description='Optimal split of a search effort budget & its solve time')
+    parser.add_argument('--effort', type=float, default=MENU_TEAMS, help='effort budget, in teams')
+    parser.add_argument('--areas', type=int, nargs='+', default=list(BENCH_AREAS), help='areas to time the solver for')
+    parser.add_argument('--games', type=int, default=BENCH_GAMES, help='games solved at once')
+    args = parser.parse_args()
+
+    # The default game at the average SEP, 1 team detects with the SEP
+    sep = np.full(len(PRIORS), (SEP_LOW + SEP_HIGH) / 2)
+    rates = -np.log1p(-sep)
+    split = optimal_effort(PRIORS, rates, args.effort)
+    print("Priors {} at SEP {:.2f}: split {} (POD {:.3f}), whole teams {}".format(
+        PRIORS, sep[0], np.round(split, 3), effort_pod(PRIORS, rates, split), team_counts(split, MENU_TEAMS)[0]))
+
+    rng = np.random.default_rng(0)
+    print("{:>8}{:>8}{:>14}{:>16}".format('Areas', 'Games', 'Solve (ms)', 'Per game (us)'))
+    for num_areas in args.areas:
+        p = rng.dirichlet(np.ones(num_areas), args.games)
+        shape = (args.games, num_areas)
+        rates = detection_rates(rng.uniform(0.5, 2, shape), rng.uniform(1, 3, shape))
+        optimal_effort(p, rates, args.effort)
+        start = time.perf_counter()
+        for _ in range(BENCH_REPEATS):
+            optimal_effort(p, rates, args.effort)
+        elapsed = (time.perf_counter() - start) / BENCH_REPEATS
+        print("{:>8d}{:>8d}{:>14.3f}{:>16.1f}".format(num_areas, args.games, elapsed * 1000,
+                                                      elapsed / args.games * 1e6))
+
+
+# Run main
+if __name__ == '__main__':
+    main()
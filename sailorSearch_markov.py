@@ -0,0 +1,209 @@
+"""
+Expected searches to find the sailor for a fixed strategy from the Markov chain of the game, no games played. While
+the sailor hasn't been found the target probs & the unsearched cells only depend on the SEPs drawn and the choices
+made, never on where the sailor is, and the sailor's cell is uniform over the cells of his/her area still
+unsearched. So after t rounds
+
+    P(not found after t rounds) = sum over the areas a of P(sailor in a) * E[unsearched_a(t) / size_a]
+
+with the expectation over the SEPs of every round. The game is a Markov chain over (target probs, unsearched cells),
+each round every state branches into SEP_POINTS^areas equally likely SEP draws and the strategy picks its choice for
+every branch at once. A strategy registered with uses_sep=False picks 1 choice per state instead, and only the
+SEP_POINTS^2 slices of the 2 areas it searches are branched on. Branches that search the same areas at the same SEPs
+end up in the same state and are followed once. States that land in the same cell of a grid (target probs to 1 /
+RESOLUTION, unsearched cells to 1 / UNSEARCHED_STEPS of the area) are merged into their weighted average, which
+keeps the chain small, and it runs until all but TOLERANCE of the probability has found the sailor. The answer is
+exact for the SEPs at the middle of the slices up to the merging, not for the continuous SEPs of the game, which is
+why it's checked against Monte Carlo. A strategy that looks at the SEPs is called on every state & branch, so the
+chain of an expensive strategy ('plan', 'effort') takes longer than a large batch of games.
+
+Running this file prints the expected searches & the distribution for every strategy and checks them against the
+batch Monte Carlo simulation of the same game.
+"""
+import time
+import argparse
+import itertools
+import numpy as np
+from sailorSearch import PRIORS, num_options, option_to_areas, sep_from_uniform
+from sailorSearch_batch import AREA_SIZES, simulate_batch, search_round
+from sailorSearch_planner import set_plan_sep_dist
+from sailorSearch_strategies import STRATEGIES, SEP_FREE
+from sailorSearch_tournament import Z_95
+
+# Part 1 - Constants
+# Equally likely slices of each area's SEP distribution, every round branches at the middle of each slice
+SEP_POINTS = 10
+
+# Merge states whose target probs round to the same multiple of 1 / RESOLUTION ...
+RESOLUTION = 50
+
+# ... and whose unsearched cells round to the same 1 / UNSEARCHED_STEPS of each area
+UNSEARCHED_STEPS = 50
+
+# States branched at once, bounds the memory a round takes
+CHUNK_STATES = 500
+
+# Stop once the prob of not having found the sailor yet is below this
+TOLERANCE = 1e-9
+
+# Longest game the chain is followed for
+MAX_ROUNDS = 10000
+
+# Games for the Monte Carlo check
+NUM_GAMES = 200000
+
+# Searches to find to print the distribution for
+SHOW_SEARCHES = 6
+
+
+# Part 2 - Follow the chain
+def merge_states(weight, p, unsearched, sizes):
+    """Return the states merged by grid cell, weights added up & target probs & unsearched cells weight averaged"""
+    keys = np.hstack((np.rint(p * RESOLUTION), np.rint(unsearched / sizes * UNSEARCHED_STEPS))).astype(np.int64)
+    radix = max(RESOLUTION, UNSEARCHED_STEPS) + 1
+    if radix**keys.shape[1] < 2**63:
+        # Pack each row into 1 int, sorting ints is far faster than sorting rows
+        keys = keys @ radix**np.arange(keys.shape[1], dtype=np.int64)
+    group = np.unique(keys, axis=0, return_inverse=True)[1].ravel()
+    total = np.bincount(group, weights=weight)
+    # Average each column over the states of the group, weighted by how likely each state is
+    def average(values):
+        return np.column_stack([np.bincount(group, weights=weight * column) for column in values.T]) / total[:, None]
+    return total, average(p), average(unsearched)
+
+
+def branch_states(strategy, weight, p, unsearched, slices, sizes, sep_dist):
+    """Return every state after 1 round of searches for every SEP branch, with the weight of each branch
+
+    slices is the (branches, areas) int array of the SEP slice of every area in each branch, all equally likely.
+    """
+    num_slices = slices.max() + 1
+    mids = sep_from_uniform((np.arange(num_slices) + 0.5) / num_slices, sep_dist)
+    # Areas of every menu choice, looked up instead of worked out for every branch
+    menu_1, menu_2 = option_to_areas(np.arange(1, num_options(p.shape[1]) + 1), p.shape[1])
+    if strategy in SEP_FREE:
+        # The choice is the same for every branch, so it's picked once per state & only the slices of the 2 areas
+        # searched are branched on, num_slices^2 branches instead of num_slices^areas
+        pairs = np.array(list(itertools.product(range(num_slices), repeat=2)))
+        num_branches = len(pairs)
+        state = np.repeat(np.arange(len(p)), num_branches)
+        choice = strategy(p, np.zeros_like(p))[state]
+        first, second = menu_1[choice - 1], menu_2[choice - 1]
+        slice_1 = np.tile(pairs[:, 0], len(p))
+        # Both searches of a double search use the area's 1 SEP
+        slice_2 = np.where(first == second, slice_1, np.tile(pairs[:, 1], len(p)))
+    else:
+        # The strategy picks its choice for the middle of every slice of every state
+        num_branches = len(slices)
+        state = np.repeat(np.arange(len(p)), num_branches)
+        branch = np.tile(np.arange(num_branches), len(p))
+        choice = strategy(p[state], mids[slices][branch])
+        first, second = menu_1[choice - 1], menu_2[choice - 1]
+        slice_1, slice_2 = slices[branch, first], slices[branch, second]
+    # Only the SEPs of the areas searched change what happens, so the branches of a state with the same choice & the
+    # same slices for the areas it searches all end up in the same place, pack those 4 into 1 int to find them
+    keys = state * (choice.max() + 1) + choice
+    keys = (keys * num_slices + slice_1) * num_slices + slice_2
+    # The keys are small ints, so counting them beats sorting them, any 1 row of a key stands for all of them
+    counts = np.bincount(keys)
+    key_rows = np.empty(len(counts), dtype=np.int64)
+    key_rows[keys] = np.arange(len(keys))
+    found = np.flatnonzero(counts)
+    rows, counts = key_rows[found], counts[found]
+    # Only the searched areas need a SEP, search_round() never looks at the rest
+    sep = np.zeros((len(rows), p.shape[1]))
+    sep[np.arange(len(rows)), first[rows]] = mids[slice_1[rows]]
+    sep[np.arange(len(rows)), second[rows]] = mids[slice_2[rows]]
+    unsearched = unsearched[state[rows]]
+    p = p[state[rows]]
+    with np.errstate(divide='ignore'):
+        p = search_round(np.log(p), p, sep, unsearched, choice[rows], sizes)[1]
+    return weight[state[rows]] * counts / num_branches, p, unsearched
+
+
+def survival_curve(strategy, sizes=AREA_SIZES, priors=PRIORS, area_probs=None, sep_dist='uniform',
+                   sep_points=SEP_POINTS):
+    """Return an array of P(not found after t rounds) for t = 0, 1, ... until it drops below TOLERANCE, area_probs is
+    where the sailor is put (by default the priors, like Search.sailor_final_location())"""
+    sizes = np.asarray(sizes)
+    num_areas = len(sizes)
+    if area_probs is None:
+        area_probs = np.asarray(priors, dtype=float) / np.sum(priors)
+    set_plan_sep_dist(sep_dist)
+    # Every combination of the equally likely slices of the SEP distribution of each area
+    slices = np.array(list(itertools.product(range(sep_points), repeat=num_areas)))
+
+    # Start with 1 state, the priors & every cell unsearched
+    weight = np.ones(1)
+    p = np.array([priors], dtype=float)
+    unsearched = np.array([sizes], dtype=float)
+    survival = [1.0]
+    while survival[-1] > TOLERANCE and len(survival) <= MAX_ROUNDS:
+        # Branch a chunk of states at a time so the branches never get too big, merging as it goes
+        merged = []
+        not_found = 0.0
+        for i in range(0, len(p), CHUNK_STATES):
+            chunk = slice(i, i + CHUNK_STATES)
+            w, q, u = branch_states(strategy, weight[chunk], p[chunk], unsearched[chunk], slices, sizes, sep_dist)
+            not_found += w @ (u / sizes) @ area_probs
+            merged.append(merge_states(w, q, u, sizes))
+        survival.append(not_found)
+        weight, p, unsearched = merge_states(*[np.concatenate(x) for x in zip(*merged)], sizes)
+    return np.array(survival)
+
+
+def expected_searches(survival):
+    """Return the expected searches to find the sailor, the sum of P(not found after t rounds) over t"""
+    return survival.sum()
+
+
+def searches_distribution(survival):
+    """Return P(found on search t) for t = 1, 2, ..."""
+    return -np.diff(survival)
+
+
+# Part 3 - Compare against the Monte Carlo simulation
+def print_check(name, survival, games, seed, sep_dist, priors=PRIORS):
+    """Print the chain's answer next to the Monte Carlo estimate for 1 strategy"""
+    chain = searches_distribution(survival)
+    print("{:>10}  chain mean {:.4f}".format(name, expected_searches(survival)), end='')
+    if games:
+        num_searches = simulate_batch(STRATEGIES[name], games, seed, sep_dist=sep_dist, priors=priors)
+        ci = Z_95 * num_searches.std(ddof=1) / np.sqrt(games)
+        inside = abs(num_searches.mean() - expected_searches(survival)) <= ci
+        print(", Monte Carlo {:.4f} +/- {:.4f} ({})".format(num_searches.mean(), ci, 'agrees' if inside else 'OFF'))
+        simulated = np.bincount(num_searches, minlength=SHOW_SEARCHES + 1)[1:SHOW_SEARCHES + 1] / games
+    else:
+        print()
+    for t in range(min(SHOW_SEARCHES, len(chain))):
+        row = "{:>22}{:>10.4f}".format('P(search %d)' % (t + 1), chain[t])
+        if games:
+            row += "{:>10.4f}".format(simulated[t])
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Expected searches to find for every strategy from the Markov chain, '
+                                                 'no sampling')
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES),
+                        help='strategies to solve (default all registered)')
+    parser.add_argument('--sep-dist', choices=('uniform', 'triangular'), default='uniform',
+                        help='distribution of the SEP draws')
+    parser.add_argument('--priors', type=float, nargs='+', default=list(PRIORS), help='pre search target probs')
+    parser.add_argument('--games', type=int, default=NUM_GAMES, help='Monte Carlo games to check against, 0 for none')
+    parser.add_argument('--seed', type=int, default=None, help='seed for the Monte Carlo check')
+    args = parser.parse_args()
+    seed = args.seed if args.seed is not None else np.random.SeedSequence().entropy
+
+    for name in args.strategies:
+        start = time.perf_counter()
+        survival = survival_curve(STRATEGIES[name], priors=args.priors, sep_dist=args.sep_dist)
+        elapsed = time.perf_counter() - start
+        print("%s solved in %.3f seconds (%d rounds)" % (name, elapsed, len(survival) - 1))
+        print_check(name, survival, args.games, seed, args.sep_dist, args.priors)
+        print()
+
+
+# Run main
+if __name__ == '__main__':
+    main()
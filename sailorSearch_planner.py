@@ -0,0 +1,195 @@
+"""
+Lookahead planner for the sailor search game. The strategies in sailorSearch_strategies.py only look at this round, the
+planner picks the menu choice with the fewest expected searches to find the sailor looking k rounds ahead (the
+horizon), counting that future SEPs are unknown until their round comes. It uses the same belief model as
+revise_target_probs(): a search of an area with SEP s covers s of it, searching it twice covers 2s (all of it past
+0.5) since the 2 searches never overlap, and the target probs get Bayes' Rule after a miss.
+
+    V_0(p) = 1 / (prob the best choice finds the sailor in 1 round at the average SEP)
+    V_k(p) = E over the SEPs s [ min over the choices c of 1 + P(miss | p, s, c) * V_k-1(p after missing with c) ]
+
+V_0 guesses the searches still needed past the horizon as if every later round went as well as the best one does now.
+V_k is solved by dynamic programming over a grid of target probs (p1, p2, p3 rounded to 1 / RESOLUTION) with the
+expectation over the SEPs taken at SEP_POINTS equally likely points per area, for uniform SEPs like sailorSearch.py
+or triangular ones like sailorSearch_pod.py. The solved tables are kept in VALUE_CACHE, a longer horizon only solves
+the levels it's missing, so after the 1st call a recommendation is 1 table lookup per menu choice.
+
+Running this file prints a benchmark of the time to solve & to recommend as the horizon grows.
+"""
+import time
+import argparse
+import itertools
+import numpy as np
+from sailorSearch import PRIORS, num_options, option_to_areas, sep_from_uniform
+
+# Part 1 - Constants
+# Number of rounds the planner looks ahead
+PLAN_HORIZON = 3
+
+# Target probs are rounded to multiples of 1 / RESOLUTION for the value tables
+RESOLUTION = 50
+
+# Points per area used for the expectation over the SEPs of a future round
+SEP_POINTS = 5
+
+# Most (belief states * SEP points * menu choices) a table is allowed to take, 4+ areas blow past it quickly
+MAX_PLAN_WORK = 20000000
+
+# Settings the 'plan' strategy reads on every call, simulate_batch() sets the SEP distribution its games are drawn from
+PLAN_SETTINGS = {'sep_dist': 'uniform'}
+
+# Solved value tables, keyed by (number of areas, resolution, SEP points, SEP distribution), each a list of V_0 ... V_k
+VALUE_CACHE = {}
+
+
+# Part 2 - The grid of target probs
+def belief_grid(num_areas, resolution=RESOLUTION):
+    """Return an (S, num_areas) int array of every way to split resolution between the areas"""
+    # Stars & bars, the gaps between num_areas - 1 bars among resolution + num_areas - 1 slots
+    bars = np.array(list(itertools.combinations(range(resolution + num_areas - 1), num_areas - 1)), dtype=np.int64)
+    bars = bars.reshape(len(bars), num_areas - 1)
+    edges = np.hstack((np.full((len(bars), 1), -1), bars, np.full((len(bars), 1), resolution + num_areas - 1)))
+    return np.diff(edges, axis=1) - 1
+
+
+def snap_to_grid(p, resolution=RESOLUTION):
+    """Return the grid counts closest to the target probs p (rows summing to 1), the counts sum to resolution"""
+    scaled = p * resolution
+    counts = np.floor(scaled).astype(np.int64)
+    # Largest remainder, hand the leftover units to the areas that lost the most by rounding down
+    short = resolution - counts.sum(axis=-1, keepdims=True)
+    rank = np.argsort(np.argsort(counts - scaled, axis=-1, kind='stable'), axis=-1, kind='stable')
+    return counts + (rank < short)
+
+
+def grid_index(counts, resolution=RESOLUTION):
+    """Return the index of grid counts into a value table, the last area is left out since the counts add up"""
+    weights = (resolution + 1)**np.arange(counts.shape[-1] - 1)
+    return counts[..., :-1] @ weights
+
+
+def sep_quadrature(num_areas, sep_points=SEP_POINTS, sep_dist='uniform'):
+    """Return a (sep_points^num_areas, num_areas) array of SEPs, every row equally likely under sep_dist"""
+    # The middle of sep_points equally likely slices of the distribution
+    mids = sep_from_uniform((np.arange(sep_points) + 0.5) / sep_points, sep_dist)
+    return np.array(list(itertools.product(mids, repeat=num_areas)))
+
+
+def planning_work(num_areas, resolution=RESOLUTION, sep_points=SEP_POINTS):
+    """Return the (belief states * SEP points * menu choices) it takes to solve 1 level of the value table"""
+    states = 1
+    for i in range(1, num_areas):
+        states = states * (resolution + i) // i
+    return states * sep_points**num_areas * num_options(num_areas)
+
+
+def can_plan(num_areas, resolution=RESOLUTION, sep_points=SEP_POINTS):
+    """Return True if the value tables for num_areas are small enough to solve"""
+    return planning_work(num_areas, resolution, sep_points) <= MAX_PLAN_WORK
+
+
+# Part 3 - One step of lookahead
+def search_counts(num_areas):
+    """Return a (menu choices, num_areas) array with the number of times each choice searches each area"""
+    area_1, area_2 = option_to_areas(np.arange(1, num_options(num_areas) + 1), num_areas)
+    eye = np.eye(num_areas, dtype=np.int64)
+    return eye[area_1] + eye[area_2]
+
+
+def after_miss(p, sep):
+    """Return the (games, menu choices) prob of missing with each choice and the target probs after that miss"""
+    # Part of each area each choice leaves unsearched, searching twice leaves 1 - 2s
+    miss = np.maximum(1 - sep[:, None, :] * search_counts(p.shape[1]), 0)
+    left = p[:, None, :] * miss
+    not_found = left.sum(axis=2)
+    # Bayes' Rule after a miss, a sure find never needs the target probs after it
+    return not_found, left / np.where(not_found > 0, not_found, 1)[:, :, None]
+
+
+def choice_values(p, sep, values, resolution=RESOLUTION):
+    """Return a (games, menu choices) array of the expected searches of each choice, values is the table for after"""
+    not_found, next_p = after_miss(p, sep)
+    return 1 + not_found * values[grid_index(snap_to_grid(next_p, resolution), resolution)]
+
+
+# Part 4 - Dynamic programming over the grid
+def solve_values(num_areas, horizon, resolution=RESOLUTION, sep_points=SEP_POINTS, sep_dist='uniform'):
+    """Return the value tables V_0 to V_horizon, only the levels not in VALUE_CACHE yet are solved"""
+    if not can_plan(num_areas, resolution, sep_points):
+        raise ValueError('Too many belief states to plan over {} search areas'.format(num_areas))
+    key = (num_areas, resolution, sep_points, sep_dist)
+    tables = VALUE_CACHE.setdefault(key, [])
+    if len(tables) > horizon:
+        return tables[:horizon + 1]
+    counts = belief_grid(num_areas, resolution)
+    p = counts / resolution
+    index = grid_index(counts, resolution)
+    seps = sep_quadrature(num_areas, sep_points, sep_dist)
+    if not tables:
+        # Past the horizon, 1 over the best find prob at the average SEP
+        not_found, _ = after_miss(p, np.broadcast_to(seps.mean(axis=0), p.shape))
+        values = np.zeros((resolution + 1)**(num_areas - 1))
+        values[index] = 1 / (1 - not_found.min(axis=1))
+        tables.append(values)
+    while len(tables) <= horizon:
+        # The SEPs are seen before choosing, so take the best choice for each SEP point then average them
+        expected = np.zeros(len(p))
+        for sep in seps:
+            expected += choice_values(p, np.broadcast_to(sep, p.shape), tables[-1], resolution).min(axis=1)
+        values = np.zeros_like(tables[-1])
+        values[index] = expected / len(seps)
+        tables.append(values)
+    return tables[:horizon + 1]
+
+
+def plan_choices(p, sep, horizon=PLAN_HORIZON, resolution=RESOLUTION, sep_points=SEP_POINTS, sep_dist='uniform'):
+    """Return the menu choice of every game (rows of p & sep) with the fewest expected searches, looking horizon
+    rounds ahead"""
+    p = np.asarray(p, dtype=float)
+    sep = np.asarray(sep, dtype=float)
+    # This round's SEPs are known, so only the rounds after it need a value table
+    tables = solve_values(p.shape[1], horizon - 1, resolution, sep_points, sep_dist)
+    values = choice_values(p, sep, tables[horizon - 1], resolution)
+    # argmin keeps the first choice on a tie, so double searches win a tie like they do for 'pod'
+    return np.argmin(values, axis=1) + 1
+
+
+def set_plan_sep_dist(sep_dist):
+    """Make the 'plan' strategy expect SEPs drawn from sep_dist ('uniform' or 'triangular')"""
+    PLAN_SETTINGS['sep_dist'] = sep_dist
+
+
+# Part 5 - Benchmark the planning latency
+def main():
+    parser = argparse.ArgumentParser(description='Planning latency of the lookahead planner as the horizon grows')
+    parser.add_argument('--max-horizon', type=int, default=8, help='longest horizon to time')
+    parser.add_argument('--resolution', type=int, default=RESOLUTION, help='grid steps per unit of target prob')
+    parser.add_argument('--sep-points', type=int, default=SEP_POINTS, help='SEP points per area')
+    parser.add_argument('--sep-dist', choices=('uniform', 'triangular'), default='uniform',
+                        help='distribution of the SEP draws')
+    parser.add_argument('--calls', type=int, default=1000, help='recommendations to average the warm latency over')
+    args = parser.parse_args()
+
+    num_areas = len(PRIORS)
+    p = np.array([PRIORS], dtype=float)
+    rng = np.random.default_rng(0)
+    print("{:>8}{:>14}{:>16}{:>10}".format('Horizon', 'Solve (ms)', 'Recommend (us)', 'Choice'))
+    for horizon in range(1, args.max_horizon + 1):
+        # Cold, solve every level from scratch (the last round needs no table of its own)
+        VALUE_CACHE.clear()
+        start = time.perf_counter()
+        solve_values(num_areas, horizon - 1, args.resolution, args.sep_points, args.sep_dist)
+        solve_ms = (time.perf_counter() - start) * 1000
+        # Warm, the tables are memoized so this is just the lookahead for 1 game
+        seps = sep_from_uniform(rng.random((args.calls, 1, num_areas)), args.sep_dist)
+        start = time.perf_counter()
+        for sep in seps:
+            plan_choices(p, sep, horizon, args.resolution, args.sep_points, args.sep_dist)
+        recommend_us = (time.perf_counter() - start) / args.calls * 1e6
+        choice = plan_choices(p, seps[0], horizon, args.resolution, args.sep_points, args.sep_dist)[0]
+        print("{:>8d}{:>14.1f}{:>16.1f}{:>10d}".format(horizon, solve_ms, recommend_us, choice))
+
+
+# Run main
+if __name__ == '__main__':
+    main()
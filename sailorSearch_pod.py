@@ -5,11 +5,17 @@ Displays a mpa, prints a menu of search choices for the user, randomly chooses a
 the location if a search locates him/her or do a Bayesian update of the probabilities of finding the sailor for each
 area.
 """
+import os
 import sys
+import time
 import random
-import itertools
+import argparse
+import multiprocessing as mp
 import numpy as np
 import cv2 as cv
+from sailorSearch import water_mask, allocation_pods, print_top_allocations
+from sailorSearch_batch import simulate_batch
+from sailorSearch_strategies import STRATEGIES
 
 # Part 1 - Constants
 # The link of the image of the map used for the game
@@ -22,6 +28,36 @@ SA3_CORNERS = (105, 205, 155, 255)
 
 COUNT = 0
 
+# Search teams sent out each round for the ranking under the menu, the menu itself is the 2 team game
+NUM_TEAMS = 2
+
+# Teams each menu choice 1-6 sends to areas 1-3
+MENU_COUNTS = np.array([[2, 0, 0], [0, 2, 0], [0, 0, 2], [1, 1, 0], [1, 0, 1], [0, 1, 1]])
+
+# Seconds the what-if rollouts get before the menu is printed, 0 to leave them off the menu. They keep playing while
+# the user decides & stop once a choice is entered
+ROLLOUT_BUDGET = 0.2
+
+# Seconds the rollouts of 1 round play at most, so a menu left waiting doesn't keep the workers busy for ever
+ROLLOUT_LIMIT = 60
+
+# Games each worker plays per menu option between checks of the clock
+ROLLOUT_CHUNK = 250
+
+# Strategy that picks every choice of a rollout after its 1st round
+ROLLOUT_POLICY = 'pod'
+
+# Worker processes for the rollouts, None for 1 per CPU
+ROLLOUT_WORKERS = None
+
+# The worker pool, started with the 1st game, the id of the round the workers should be playing & the running totals
+# of the searches & games of each menu choice they've played for it (shared with the workers, updated under the lock)
+ROLLOUT_POOL = None
+ROLLOUT_ROUND = None
+ROLLOUT_TOTALS = None
+ROLLOUT_GAMES = None
+ROLLOUT_LOCK = None
+
 
 # Part 2 - Define the search class, the blueprint of the game
 class Search():
@@ -48,6 +84,19 @@ class Search():
         self.sa3 = self.img[SA3_CORNERS[1] : SA3_CORNERS[3],
                             SA3_CORNERS[0] : SA3_CORNERS[2]]
 
+        # Water pixels of each search area, the only cells the sailor can be in & the searches spend effort on
+        water = water_mask(MAP_FILE)
+        self.water1 = water[SA1_CORNERS[1] : SA1_CORNERS[3],
+                            SA1_CORNERS[0] : SA1_CORNERS[2]]
+        self.water2 = water[SA2_CORNERS[1] : SA2_CORNERS[3],
+                            SA2_CORNERS[0] : SA2_CORNERS[2]]
+        self.water3 = water[SA3_CORNERS[1] : SA3_CORNERS[3],
+                            SA3_CORNERS[0] : SA3_CORNERS[2]]
+        # Effective size of each search area, its number of water cells
+        self.size1 = np.count_nonzero(self.water1)
+        self.size2 = np.count_nonzero(self.water2)
+        self.size3 = np.count_nonzero(self.water3)
+
         # Set the pre search probs for finding the sailor in each area
         self.p1 = 0.2
         self.p2 = 0.5
@@ -109,13 +158,15 @@ class Search():
     # Part 4 - Method to randomly choose the sailor's actual location
     def sailor_final_location(self, num_search_areas):
         """Return the actual x, y location of the missing sailor"""
-        # Find sailor coordinates, since all search areas are the same size
-        self.sailor_actual[0] = np.random.choice(self.sa1.shape[1], 1)
-        self.sailor_actual[1] = np.random.choice(self.sa1.shape[0], 1)
-
         # Choose a search area by using the triangular distribution
         area = int(random.triangular(1, num_search_areas + 1))
 
+        # Find sailor coordinates, a random water cell of the area so he/she is never put on land
+        ys, xs = np.nonzero((self.water1, self.water2, self.water3)[area - 1])
+        cell = np.random.choice(len(xs))
+        self.sailor_actual[0] = int(xs[cell])
+        self.sailor_actual[1] = int(ys[cell])
+
         if area == 1:
             # Convert search location to global image
             x = self.sailor_actual[0] + SA1_CORNERS[0]
@@ -148,13 +199,12 @@ class Search():
         self.pod2 = self.sep2 * self.p2
         self.pod3 = self.sep3 * self.p3
 
-    # Necessary parameters are the area to search chosen by player, area sub_array and randomly set SEP value
-    def conduct_search(self, area_num, area_array, effectiveness_prob, coords_lst):
+    # Necessary parameters are the area to search chosen by player, area water mask and randomly set SEP value
+    def conduct_search(self, area_num, area_water, effectiveness_prob, coords_lst):
         """Return search results and list of searched coordinates"""
-        local_y_range = range(area_array.shape[0])
-        local_x_range = range(area_array.shape[1])
-        # Generate list of all coordinates in the search area
-        coords = list(itertools.product(local_x_range, local_y_range))
+        # Generate list of all water coordinates in the search area, land is never searched
+        local_x, local_y = np.nonzero(area_water.T)
+        coords = list(zip(local_x.tolist(), local_y.tolist()))
         coords_not_searched = set()
         # Challenge 1 - Now create new coords list that takes into account any already searched areas
         if len(coords_lst) > 0:
@@ -167,7 +217,7 @@ class Search():
                     coords_not_searched.add(x)
                 i = i + 1
                 # This is an addition to make sure that when a user has fully searched an area they are aware of that
-                if len(coords_not_searched) == 2500:
+                if len(coords_not_searched) == len(coords):
                     # Here then coords_not_searched is all of the coords so attempt to break out of while loop
                     i = len(coords_lst) + 1
                     print("This implies the whole area has already been searched!")
@@ -201,35 +251,125 @@ class Search():
         self.p2 *= (1 - self.sep2) / denom
         self.p3 *= (1 - self.sep3) / denom
 
-    def draw_menu(self, search_num):
-        """Print menu of choices for conducting search areas"""
+    def draw_menu(self, search_num, rollouts=None):
+        """Print menu of choices for conducting search areas, with the expected searches of the what-if rollouts"""
         # Challenge 3 - Calculate the actual pods for each specific search
-        pod1_twice = 1 - (1 - self.pod1)**2
-        pod2_twice = 1 - (1 - self.pod2)**2
-        pod3_twice = 1 - (1 - self.pod3)**2
-        pod1_pod2 = self.pod1 + self.pod2
-        pod2_pod3 = self.pod2 + self.pod3
-        pod1_pod3 = self.pod1 + self.pod3
+        probs = (self.p1, self.p2, self.p3)
+        seps = (self.sep1, self.sep2, self.sep3)
+        pods = allocation_pods(probs, seps, MENU_COUNTS)
+        # Expected searches to find the sailor picking each choice now, '-' for a choice no rollout finished for
+        expected = ['-'] * len(MENU_COUNTS)
+        if rollouts is not None:
+            for i, (mean, games) in enumerate(zip(*rollouts)):
+                if games:
+                    expected[i] = '%.2f (%d games)' % (mean, games)
         print('\nSearch {}'.format(search_num))
         print(
             """
             Choose next areas to search:
             0 - Quit
             1 - Search Area 1 twice
-             Probability of detection: %.3f
+             Probability of detection: %.3f  Expected searches: %s
             2 - Search Area 2 twice
-             Probability of detection: %.3f
+             Probability of detection: %.3f  Expected searches: %s
             3 - Search Area 3 twice
-              Probability of detection: %.3f
+              Probability of detection: %.3f  Expected searches: %s
             4 - Search Areas 1 & 2
-              Probability of detection: %.3f
+              Probability of detection: %.3f  Expected searches: %s
             5 - Search Areas 1 & 3             
-              Probability of detection: %.3f
+              Probability of detection: %.3f  Expected searches: %s
             6 - Search Areas 2 & 3             
-              Probability of detection: %.3f
+              Probability of detection: %.3f  Expected searches: %s
             7 - Start Over
-            """ % (pod1_twice, pod2_twice, pod3_twice, pod1_pod2, pod1_pod3, pod2_pod3)
+            """ % tuple(value for row in zip(pods, expected) for value in row)
         )
+        print_top_allocations(probs, seps, NUM_TEAMS, indent=' ' * 12)
+
+
+# Part 6b - What-if rollouts of every menu choice, played in a worker pool while the menu waits
+def unsearched_cells(area_water, coords_lst):
+    """Return the number of water cells of a search area no search has covered yet"""
+    return np.count_nonzero(area_water) - len(set().union(*coords_lst))
+
+
+def init_rollout_worker(current_round, totals, games, lock):
+    """Pool initializer, hand every worker the shared id of the round to play & the running totals to add to"""
+    global ROLLOUT_ROUND, ROLLOUT_TOTALS, ROLLOUT_GAMES, ROLLOUT_LOCK
+    ROLLOUT_ROUND, ROLLOUT_TOTALS, ROLLOUT_GAMES, ROLLOUT_LOCK = current_round, totals, games, lock
+
+
+def rollout_pool():
+    """Return the rollout worker pool, started on the 1st call & reused by every game after that"""
+    global ROLLOUT_POOL, ROLLOUT_ROUND, ROLLOUT_TOTALS, ROLLOUT_GAMES, ROLLOUT_LOCK
+    if ROLLOUT_POOL is None:
+        # Same as the Monte Carlo runner, fork where the platform has it so the workers share the parent's imports
+        context = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else None)
+        ROLLOUT_ROUND = context.Value('i', 0, lock=False)
+        ROLLOUT_TOTALS = context.Array('d', len(MENU_COUNTS), lock=False)
+        ROLLOUT_GAMES = context.Array('q', len(MENU_COUNTS), lock=False)
+        ROLLOUT_LOCK = context.Lock()
+        ROLLOUT_POOL = context.Pool(ROLLOUT_WORKERS or os.cpu_count(), initializer=init_rollout_worker,
+                                    initargs=(ROLLOUT_ROUND, ROLLOUT_TOTALS, ROLLOUT_GAMES, ROLLOUT_LOCK))
+    return ROLLOUT_POOL
+
+
+def play_rollouts(args):
+    """Worker job, play chunks of rollouts of every menu choice until the round is cancelled or the deadline, adding
+    each chunk's searches & games to the running totals of its choice as soon as it's done"""
+    round_id, probs, seps, unsearched, sizes, policy, deadline, seed = args
+    rng = np.random.default_rng(seed)
+    while True:
+        # Every choice plays the same draws, so the differences between choices aren't swamped by the noise
+        chunk_seed = int(rng.integers(2**63))
+        for i in range(len(MENU_COUNTS)):
+            if time.time() >= deadline or ROLLOUT_ROUND.value != round_id:
+                return
+            num_searches = simulate_batch(STRATEGIES[policy], ROLLOUT_CHUNK, chunk_seed, sep_dist='triangular',
+                                          sizes=sizes, priors=probs, unsearched=unsearched, first_choice=i + 1,
+                                          first_sep=seps)
+            # A chunk finished after its round was chosen would land in the next round's totals, so it's dropped
+            with ROLLOUT_LOCK:
+                if ROLLOUT_ROUND.value == round_id:
+                    ROLLOUT_TOTALS[i] += num_searches.sum()
+                    ROLLOUT_GAMES[i] += ROLLOUT_CHUNK
+
+
+def report_rollout_error(error):
+    """Error callback of the rollout jobs, a worker that fails only leaves its games off the menu"""
+    print('Rollout worker failed: {}'.format(error), file=sys.stderr)
+
+
+def run_rollouts(probs, seps, unsearched, sizes, budget=ROLLOUT_BUDGET, policy=ROLLOUT_POLICY):
+    """Start the rollouts of this round & return the mean searches to find the sailor picking each menu choice now
+    (the policy picking every round after) & the games behind each mean, from what the workers finish within budget
+    seconds. The workers keep playing while the user decides, until cancel_rollouts()"""
+    pool = rollout_pool()
+    start = time.time()
+    with ROLLOUT_LOCK:
+        round_id = ROLLOUT_ROUND.value
+        ROLLOUT_TOTALS[:] = [0] * len(MENU_COUNTS)
+        ROLLOUT_GAMES[:] = [0] * len(MENU_COUNTS)
+    seeds = np.random.SeedSequence().generate_state(ROLLOUT_WORKERS or os.cpu_count(), dtype=np.uint64)
+    for seed in seeds:
+        pool.apply_async(play_rollouts, ((round_id, probs, seps, unsearched, sizes, policy, start + ROLLOUT_LIMIT,
+                                          int(seed)),), error_callback=report_rollout_error)
+    time.sleep(max(start + budget - time.time(), 0))
+    return rollout_results()
+
+
+def rollout_results():
+    """Return the mean searches of each menu choice & the games behind each mean, from the rollouts so far"""
+    with ROLLOUT_LOCK:
+        totals = np.array(ROLLOUT_TOTALS[:])
+        games = np.array(ROLLOUT_GAMES[:], dtype=np.int64)
+    return totals / np.maximum(games, 1), games
+
+
+def cancel_rollouts():
+    """Stop the rollouts of the round that was just chosen, workers still playing it give up at their next chunk"""
+    if ROLLOUT_ROUND is not None:
+        with ROLLOUT_LOCK:
+            ROLLOUT_ROUND.value += 1
 
 
 # Challenge 2 - Create simulation to choose options 1-3 based on the highest prob.
@@ -289,8 +429,16 @@ def main(count, num_searches_hp, num_searches_jp):
     while True:
         # Show the menu and have the user play the game
         app.calc_search_effectiveness()
-        app.draw_menu(search_num)
+        # Play what-if rollouts of every choice from here, the menu shows what they finish within ROLLOUT_BUDGET
+        rollouts = None
+        if ROLLOUT_BUDGET > 0:
+            unsearched = [unsearched_cells(water, coords) for water, coords in
+                          zip((app.water1, app.water2, app.water3), (lst_coords_1, lst_coords_2, lst_coords_3))]
+            rollouts = run_rollouts((app.p1, app.p2, app.p3), (app.sep1, app.sep2, app.sep3), unsearched,
+                                    [app.size1, app.size2, app.size3], ROLLOUT_BUDGET, ROLLOUT_POLICY)
+        app.draw_menu(search_num, rollouts)
         choice = input('Choice: ')
+        cancel_rollouts()
 
         # Challenge 2 - Here split up the simulation runs so that both can be run in same while loop
         # if count <= NUM_SIMULATIONS / 2:
@@ -305,55 +453,55 @@ def main(count, num_searches_hp, num_searches_jp):
             sys.exit()
         # Choices 1-3
         elif choice == "1":
-            results_1, coords_1 = app.conduct_search(1, app.sa1, app.sep1, lst_coords_1)
+            results_1, coords_1 = app.conduct_search(1, app.water1, app.sep1, lst_coords_1)
             # Append the coords searched to the list
             lst_coords_1.append(coords_1)
-            results_2, coords_2 = app.conduct_search(1, app.sa1, app.sep1, lst_coords_1)
+            results_2, coords_2 = app.conduct_search(1, app.water1, app.sep1, lst_coords_1)
             # Append the coords searched to the list
             lst_coords_1.append(coords_2)
             # Determine overall sep for both searches on the same area
-            app.sep1 = (len(set(coords_1 + coords_2))) / (len(app.sa1)**2)
+            app.sep1 = (len(set(coords_1 + coords_2))) / app.size1
             app.sep2 = 0
             app.sep3 = 0
         elif choice == "2":
-            results_1, coords_1 = app.conduct_search(2, app.sa2, app.sep2, lst_coords_2)
+            results_1, coords_1 = app.conduct_search(2, app.water2, app.sep2, lst_coords_2)
             # Append the coords searched to the list
             lst_coords_2.append(coords_1)
-            results_2, coords_2 = app.conduct_search(2, app.sa2, app.sep2, lst_coords_2)
+            results_2, coords_2 = app.conduct_search(2, app.water2, app.sep2, lst_coords_2)
             # Append the coords searched to the list
             lst_coords_2.append(coords_2)
             app.sep1 = 0
             # Determine overall sep for both searches on the same area
-            app.sep2 = (len(set(coords_1 + coords_2))) / (len(app.sa2) ** 2)
+            app.sep2 = (len(set(coords_1 + coords_2))) / app.size2
             app.sep3 = 0
         elif choice == "3":
-            results_1, coords_1 = app.conduct_search(3, app.sa3, app.sep3, lst_coords_3)
+            results_1, coords_1 = app.conduct_search(3, app.water3, app.sep3, lst_coords_3)
             # Append the coords searched to the list
             lst_coords_3.append(coords_1)
-            results_2, coords_2 = app.conduct_search(3, app.sa3, app.sep3, lst_coords_3)
+            results_2, coords_2 = app.conduct_search(3, app.water3, app.sep3, lst_coords_3)
             # Append the coords searched to the list
             lst_coords_3.append(coords_2)
             app.sep1 = 0
             app.sep2 = 0
             # Determine overall sep for both searches on the same area
-            app.sep3 = (len(set(coords_1 + coords_2))) / (len(app.sa3) ** 2)
+            app.sep3 = (len(set(coords_1 + coords_2))) / app.size3
         # Choices 4-6 mean the search teams will search 2 areas so no need to recalculate SEP
         elif choice == "4":
-            results_1, coords_1 = app.conduct_search(1, app.sa1, app.sep1, lst_coords_1)
+            results_1, coords_1 = app.conduct_search(1, app.water1, app.sep1, lst_coords_1)
             lst_coords_1.append(coords_1)
-            results_2, coords_2 = app.conduct_search(2, app.sa2, app.sep2, lst_coords_2)
+            results_2, coords_2 = app.conduct_search(2, app.water2, app.sep2, lst_coords_2)
             lst_coords_2.append(coords_2)
             app.sep3 = 0
         elif choice == "5":
-            results_1, coords_1 = app.conduct_search(1, app.sa1, app.sep1, lst_coords_1)
+            results_1, coords_1 = app.conduct_search(1, app.water1, app.sep1, lst_coords_1)
             lst_coords_1.append(coords_1)
-            results_2, coords_2 = app.conduct_search(3, app.sa3, app.sep3, lst_coords_3)
+            results_2, coords_2 = app.conduct_search(3, app.water3, app.sep3, lst_coords_3)
             lst_coords_3.append(coords_2)
             app.sep2 = 0
         elif choice == "6":
-            results_1, coords_1 = app.conduct_search(3, app.sa3, app.sep3, lst_coords_3)
+            results_1, coords_1 = app.conduct_search(3, app.water3, app.sep3, lst_coords_3)
             lst_coords_3.append(coords_1)
-            results_2, coords_2 = app.conduct_search(2, app.sa2, app.sep2, lst_coords_2)
+            results_2, coords_2 = app.conduct_search(2, app.water2, app.sep2, lst_coords_2)
             lst_coords_2.append(coords_2)
             app.sep1 = 0
         # Reset game and clear map
@@ -439,6 +587,18 @@ def main(count, num_searches_hp, num_searches_jp):
 
 # Run main
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play the search game with the pod of every choice on the menu')
+    parser.add_argument('--teams', type=int, default=NUM_TEAMS, help='teams to rank the allocations of')
+    parser.add_argument('--rollout-ms', type=float, default=ROLLOUT_BUDGET * 1000,
+                        help='milliseconds of what-if rollouts before each menu, 0 for none')
+    parser.add_argument('--policy', choices=list(STRATEGIES), default=ROLLOUT_POLICY,
+                        help='strategy the rollouts play after their 1st round')
+    parser.add_argument('--workers', type=int, default=None, help='rollout worker processes (default 1 per CPU)')
+    args = parser.parse_args()
+    NUM_TEAMS = args.teams
+    ROLLOUT_BUDGET = args.rollout_ms / 1000
+    ROLLOUT_POLICY = args.policy
+    ROLLOUT_WORKERS = args.workers
     # Create count, these arguments need to be given to the main() method since the method is recursive
     count = 0
     # Create lists to contain total number of searches for monte carlo simulations
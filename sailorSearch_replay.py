@@ -0,0 +1,100 @@
+"""
+Replay of logged sailor search games. sailorSearch.py run with --record FILE appends every game to FILE as 1 line of
+JSON with the game's seed and, for every round, the choice, both found flags & the target probs after it. Seeding
+np.random with the logged seed and making the same choices plays the exact same game, so this file plays
+every logged game again headless, as fast as the engine goes, and checks every round comes out identical.
+
+A corpus of logged games is both a regression test (any change to the engine that changes a game shows up as a
+mismatch) and a benchmark (the games & rounds per second of the replay). --add N plays N more games with a strategy
+and logs them, to grow a corpus without playing by hand.
+"""
+import sys
+import json
+import time
+import argparse
+from sailorSearch import Search, new_seed, seed_game, log_round, save_game
+from sailorSearch_strategies import STRATEGIES, choose
+
+# Part 1 - Constants
+# Log the replay reads by default
+GAME_LOG = 'games.jsonl'
+
+
+# Part 2 - Play a game from its log
+def load_games(log_file):
+    """Return the list of logged games in log_file"""
+    with open(log_file) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def replay_game(game, app):
+    """Play a logged game again headless on app with its seed & choices, return the rounds it comes out with"""
+    seed_game(game['seed'])
+    # main() builds a new Search after seeding, reseeding & resetting app puts it in the same state without the build
+    app.reseed()
+    app.reset()
+    app.sailor_final_location(num_search_areas=app.num_areas)
+    rounds = []
+    for choice, *_ in game['rounds']:
+        app.calc_search_effectiveness()
+        _, _, found_1, found_2 = app.search_choice(choice)
+        app.revise_target_probs()
+        log_round(rounds, choice, found_1, found_2, app.probs)
+    return rounds
+
+
+def record_game(app, strategy, seed=None):
+    """Play a new game headless on app with strategy picking every choice, return its log"""
+    seed = new_seed() if seed is None else seed
+    seed_game(seed)
+    app.reseed()
+    app.reset()
+    app.sailor_final_location(num_search_areas=app.num_areas)
+    rounds = []
+    found_1 = found_2 = False
+    while not (found_1 or found_2):
+        app.calc_search_effectiveness()
+        choice = choose(strategy, app.probs, app.seps)
+        _, _, found_1, found_2 = app.search_choice(choice)
+        app.revise_target_probs()
+        log_round(rounds, choice, found_1, found_2, app.probs)
+    return {'seed': seed, 'rounds': rounds}
+
+
+# Part 3 - Check a corpus & time it
+def replay_log(games):
+    """Replay every game, return the indexes of the games that didn't come out identical & the seconds it took"""
+    # Only 1 Search is built so the map is read & labelled once
+    app = Search('Replay', verbose=False)
+    start = time.perf_counter()
+    mismatches = [i for i, game in enumerate(games) if replay_game(game, app) != game['rounds']]
+    return mismatches, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay logged games headless & check they come out identical')
+    parser.add_argument('--log', default=GAME_LOG, help='game log to replay, 1 game of JSON per line')
+    parser.add_argument('--add', type=int, default=0, help='play & log this many new games before replaying')
+    parser.add_argument('--strategy', choices=list(STRATEGIES), default='pod', help='strategy for the new games')
+    args = parser.parse_args()
+
+    app = Search('Record', verbose=False)
+    for _ in range(args.add):
+        game = record_game(app, STRATEGIES[args.strategy])
+        save_game(game['seed'], game['rounds'], args.log)
+
+    games = load_games(args.log)
+    mismatches, elapsed = replay_log(games)
+    num_rounds = sum(len(game['rounds']) for game in games)
+    print("%d games, %d rounds replayed in %.3f seconds (%.0f games/sec, %.0f rounds/sec)" % (
+        len(games), num_rounds, elapsed, len(games) / elapsed, num_rounds / elapsed))
+    if mismatches:
+        for i in mismatches:
+            print("Game %d (seed %d) did not replay identically" % (i + 1, games[i]['seed']), file=sys.stderr)
+        sys.exit(1)
+    print("Every game replayed identically")
+
+
+# Run main
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Sequential version of the strategy comparison, no need to guess NUM_SIMULATIONS up front. The strategies play batches
+of the same games (common random numbers) and keep running statistics of the searches to find the sailor: Welford
+mean & variance for every strategy and for the difference between every pair of strategies, plus a histogram of the
+search counts for the quantiles (the counts are small integers so the histogram is exact). The run stops as soon as
+the 95% confidence interval of every difference is narrower than the target width, or when the game budget runs out.
+"""
+import time
+import argparse
+import itertools
+import numpy as np
+from sailorSearch_batch import simulate_batch
+from sailorSearch_strategies import STRATEGIES
+from sailorSearch_tournament import pair_means, Z_95
+
+# Full width of the 95% CI on the difference between strategies to stop at
+TARGET_WIDTH = 0.02
+
+# Most games any strategy is allowed to play
+MAX_GAMES = 2000000
+
+# Games in the first batch, every batch after that is twice as big up to MAX_BATCH
+FIRST_BATCH = 1000
+MAX_BATCH = 131072
+
+
+class RunningStats():
+    """Welford running mean & variance plus a histogram of the values for exact quantiles"""
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def update(self, values):
+        """Add an array of values, merged into the running mean & variance with the parallel form of Welford"""
+        n = len(values)
+        if n == 0:
+            return
+        mean = values.mean()
+        m2 = ((values - mean)**2).sum()
+        delta = mean - self.mean
+        total = self.n + n
+        self.mean += delta * n / total
+        self.m2 += m2 + delta**2 * self.n * n / total
+        self.n = total
+
+    def add_to_histogram(self, values):
+        """Count an array of integer values in the histogram"""
+        counts = np.bincount(values.astype(np.int64))
+        if len(counts) > len(self.counts):
+            self.counts = np.pad(self.counts, (0, len(counts) - len(self.counts)))
+        self.counts[:len(counts)] += counts
+
+    def variance(self):
+        """Return the sample variance of the values so far"""
+        return self.m2 / (self.n - 1) if self.n > 1 else float('inf')
+
+    def ci_half_width(self):
+        """Return the half width of the 95% CI of the mean"""
+        return Z_95 * np.sqrt(self.variance() / self.n) if self.n > 1 else float('inf')
+
+    def quantile(self, q):
+        """Return the q quantile (0-1) from the histogram"""
+        cumulative = np.cumsum(self.counts)
+        return int(np.searchsorted(cumulative, q * cumulative[-1]))
+
+
+def batch_seed(seed, batch_num):
+    """Return the seed of one batch, every strategy plays the same games in the same batch"""
+    return int(np.random.SeedSequence([seed, batch_num]).generate_state(1)[0])
+
+
+def run_until_confident(names, seed, target_width=TARGET_WIDTH, max_games=MAX_GAMES, antithetic=False,
+                        sep_dist='uniform'):
+    """Play batches until every pairwise difference CI is narrower than target_width or max_games is reached, with 1
+    strategy there are no pairs so its own CI of the mean has to get that narrow
+
+    Returns the per strategy RunningStats, the per pair RunningStats of the differences and whether the target was
+    met. With antithetic games the mean & variance use the pair averages.
+    """
+    stats = {name: RunningStats() for name in names}
+    diffs = {pair: RunningStats() for pair in itertools.combinations(names, 2)}
+    games = 0
+    batch_num = 0
+    batch_size = FIRST_BATCH
+    while True:
+        batch_size = min(batch_size, max_games - games)
+        num_searches = {}
+        for name in names:
+            num_searches[name] = simulate_batch(STRATEGIES[name], batch_size, batch_seed(seed, batch_num),
+                                                antithetic, sep_dist).astype(float)
+            stats[name].update(pair_means(num_searches[name]) if antithetic else num_searches[name])
+            stats[name].add_to_histogram(num_searches[name])
+        for a, b in diffs:
+            diff = num_searches[b] - num_searches[a]
+            diffs[(a, b)].update(pair_means(diff) if antithetic else diff)
+        games += batch_size
+        batch_num += 1
+        # Stop as soon as every difference (or the only strategy's mean) is known tightly enough, or the budget is
+        # used up
+        widest = max(2 * d.ci_half_width() for d in (diffs or stats).values())
+        if widest <= target_width:
+            return stats, diffs, True
+        if games >= max_games:
+            return stats, diffs, False
+        batch_size = min(2 * batch_size, MAX_BATCH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare strategies until the difference CI is tight enough')
+    parser.add_argument('--width', type=float, default=TARGET_WIDTH, help='full width of the 95%% CI to stop at')
+    parser.add_argument('--max-games', type=int, default=MAX_GAMES, help='game budget per strategy')
+    parser.add_argument('--seed', type=int, default=None, help='seed for reproducible runs')
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES),
+                        help='strategies to compare (default all registered)')
+    parser.add_argument('--antithetic', action='store_true', help='play the games in antithetic pairs')
+    parser.add_argument('--sep-dist', choices=('uniform', 'triangular'), default='uniform',
+                        help='distribution of the SEP draws')
+    args = parser.parse_args()
+    seed = args.seed if args.seed is not None else np.random.SeedSequence().entropy
+
+    start = time.perf_counter()
+    stats, diffs, met = run_until_confident(args.strategies, seed, args.width, args.max_games, args.antithetic,
+                                            args.sep_dist)
+    elapsed = time.perf_counter() - start
+    games = int(stats[args.strategies[0]].counts.sum())
+    reason = 'target CI width reached' if met else 'game budget used up'
+    print("Stopped after %d games per strategy in %.3f seconds, %s (seed %d)\n" % (games, elapsed, reason, seed))
+    print("{:>16}{:>10}{:>12}{:>8}{:>8}{:>8}".format('Strategy', 'Mean', '95% CI +/-', 'Median', 'P90', 'P99'))
+    for name, s in stats.items():
+        print("{:>16}{:>10.3f}{:>12.4f}{:>8d}{:>8d}{:>8d}".format(name, s.mean, s.ci_half_width(), s.quantile(0.5),
+                                                                 s.quantile(0.9), s.quantile(0.99)))
+    for (a, b), d in diffs.items():
+        print("{:>16}{:>10.3f}{:>12.4f}".format('%s - %s' % (b, a), d.mean, d.ci_half_width()))
+
+
+# Run main
+if __name__ == '__main__':
+    main()
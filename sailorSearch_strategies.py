@@ -0,0 +1,99 @@
+"""
+Search strategies for the sailor search game. A strategy looks at the belief state of each game, the target probs p
+and the SEPs drawn for this round, and returns the menu choice to play. Both p & sep are (N, number of areas) arrays
+with 1 row per game, so the same function drives the interactive game (N = 1), the headless runner and the batch
+simulator, for 3 search areas or thousands of grid cells.
+New strategies only need the @register_strategy decorator to show up in the Monte Carlo runner & the tournament, one
+whose choice never looks at sep should pass uses_sep=False so the Markov chain solver only branches on the SEPs of the
+areas it searches.
+"""
+import numpy as np
+from sailorSearch import areas_to_option
+from sailorSearch_planner import PLAN_HORIZON, PLAN_SETTINGS, can_plan, plan_choices
+from sailorSearch_effort import MENU_TEAMS, optimal_effort, team_counts
+
+# Every registered strategy by name
+STRATEGIES = {}
+
+# Strategies whose choice only depends on p, the same for every SEP drawn
+SEP_FREE = set()
+
+
+def register_strategy(name, uses_sep=True):
+    """Decorator that adds a strategy function to STRATEGIES under name, & to SEP_FREE if it never looks at sep"""
+    def decorator(func):
+        STRATEGIES[name] = func
+        if not uses_sep:
+            SEP_FREE.add(func)
+        return func
+    return decorator
+
+
+def choose(strategy, p, sep):
+    """Return the menu choice string for a single game from its target probs & SEPs"""
+    choice = strategy(np.array([p], dtype=float), np.array([sep], dtype=float))
+    return str(int(choice[0]))
+
+
+def top_two(values):
+    """Return the columns of the largest & 2nd largest value in every row, the first column wins a tie"""
+    rows = np.arange(len(values))
+    first = np.argmax(values, axis=1)
+    rest = values.astype(float)
+    rest[rows, first] = -np.inf
+    return first, np.argmax(rest, axis=1)
+
+
+# Challenge 2 - Choose to double search an area based on the highest prob.
+@register_strategy('hp', uses_sep=False)
+def monte_carlo_hp(p, sep):
+    """Return the choice that searches the area with the highest probability twice"""
+    # argmax keeps the first area on a tie, same as the old >= chain
+    best = np.argmax(p, axis=1)
+    return areas_to_option(best, best, p.shape[1])
+
+
+# Basically same as above method just uses joint probability instead of highest
+@register_strategy('jp', uses_sep=False)
+def monte_carlo_jp(p, sep):
+    """Return the choice that searches the 2 areas with the highest joint probability"""
+    # The best pair is always the 2 most likely areas, no need to add up every pair
+    first, second = top_two(p)
+    return areas_to_option(first, second, p.shape[1])
+
+
+# Challenge 3 - Use the probability of detection the POD menu prints to actually pick the choice
+@register_strategy('pod')
+def pod_greedy(p, sep):
+    """Return the choice with the highest probability of detection for this round"""
+    pod = p * sep
+    rows = np.arange(len(p))
+    # Best double search is the area with the highest pod, best pair is the 2 highest pods
+    first, second = top_two(pod)
+    double_pod = 1 - (1 - pod[rows, first])**2
+    pair_pod = pod[rows, first] + pod[rows, second]
+    # Double searches come first on the menu so they win a tie
+    return np.where(double_pod >= pair_pod, areas_to_option(first, first, p.shape[1]),
+                    areas_to_option(first, second, p.shape[1]))
+
+
+# Look further than 1 round, the planner's value tables are solved on the first call & reused after that
+@register_strategy('plan')
+def lookahead_plan(p, sep):
+    """Return the choice with the fewest expected searches looking PLAN_HORIZON rounds ahead"""
+    # Too many areas for the value tables, fall back to the best choice for this round
+    if not can_plan(p.shape[1]):
+        return pod_greedy(p, sep)
+    return plan_choices(p, sep, PLAN_HORIZON, sep_dist=PLAN_SETTINGS['sep_dist'])
+
+
+# Spread the teams like search theory says a continuous effort should be, then round to whole teams
+@register_strategy('effort')
+def koopman_effort(p, sep):
+    """Return the choice closest to the split of the menu's teams that finds the sailor with the highest prob"""
+    # 1 team in area i detects with prob sep_i, the exponential detection function with rate -log(1 - sep_i)
+    counts = team_counts(optimal_effort(p, -np.log1p(-sep), MENU_TEAMS), MENU_TEAMS)
+    first, second = top_two(counts)
+    # An area that gets both teams is searched twice
+    second = np.where(counts[np.arange(len(p)), first] > 1, first, second)
+    return areas_to_option(first, second, p.shape[1])
@@ -0,0 +1,176 @@
+"""
+Parameter sweep for the sailor search game. Plays every cell of a grid of priors x SEP distributions x strategies with
+the batch simulator, spread over a process pool, and prints a table (or writes a CSV) of the searches to find the
+sailor for each cell. Uniform SEPs are the game in sailorSearch.py, triangular ones the game in sailorSearch_pod.py.
+
+Every finished cell is saved to CACHE_DIR, keyed by its parameters, the games, the seed & a hash of the code the
+results depend on, so re-running a sweep or adding priors & strategies to it only plays the cells not seen before, and
+changing the game or a strategy makes every old cell miss.
+"""
+import os
+import csv
+import sys
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing as mp
+import numpy as np
+from sailorSearch import PRIORS
+from sailorSearch_batch import simulate_batch
+from sailorSearch_strategies import STRATEGIES
+from sailorSearch_tournament import PERCENTILES, Z_95
+
+# Part 1 - Constants
+# Folder the finished cells are saved in
+CACHE_DIR = '.sweep_cache'
+
+# Files whose code or data decides the results, the cache key changes whenever 1 of them does. The map is in it since
+# its water mask sets the area sizes, & the tournament & this file since they compute the cached statistics
+CODE_FILES = ('sailorSearch.py', 'sailorSearch_batch.py', 'sailorSearch_strategies.py', 'sailorSearch_planner.py',
+              'sailorSearch_effort.py', 'sailorSearch_tournament.py', 'sailorSearch_sweep.py', 'cape_python.png')
+
+# Games played in every cell
+NUM_GAMES = 100000
+
+# Columns of the output, the parameters of a cell then its statistics
+COLUMNS = ('priors', 'sep_dist', 'strategy', 'games', 'mean', 'ci_95', 'std', 'median') + \
+          tuple('p%d' % pct for pct in PERCENTILES) + ('max',)
+
+
+# Part 2 - The on disk cache
+def code_version():
+    """Return a short hash of the code & map in CODE_FILES"""
+    digest = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in CODE_FILES:
+        with open(os.path.join(here, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def cell_key(cell, games, seed, version):
+    """Return the cache key of a cell, a hash of everything its results depend on"""
+    priors, sep_dist, strategy = cell
+    params = {'priors': list(priors), 'sep_dist': sep_dist, 'strategy': strategy, 'games': games, 'seed': seed,
+              'code': version}
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def load_cell(cache_dir, key):
+    """Return the saved statistics of a cell, None if it hasn't been played"""
+    path = os.path.join(cache_dir, key + '.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_cell(cache_dir, key, stats):
+    """Save the statistics of a finished cell, written to a temp file 1st so a killed sweep never leaves half a file"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key + '.json')
+    with open(path + '.tmp', 'w') as f:
+        json.dump(stats, f)
+    os.replace(path + '.tmp', path)
+
+
+# Part 3 - Play the cells
+def play_cell(args):
+    """Worker job, play the games of 1 cell & return its key with its statistics"""
+    key, (priors, sep_dist, strategy), games, seed = args
+    num_searches = simulate_batch(STRATEGIES[strategy], games, seed, sep_dist=sep_dist, priors=priors)
+    stats = {'priors': ' '.join('%g' % p for p in priors), 'sep_dist': sep_dist, 'strategy': strategy,
+             'games': games, 'mean': num_searches.mean(), 'ci_95': Z_95 * num_searches.std(ddof=1) / np.sqrt(games),
+             'std': num_searches.std(ddof=1), 'median': np.median(num_searches)}
+    for pct in PERCENTILES:
+        stats['p%d' % pct] = np.percentile(num_searches, pct)
+    stats['max'] = int(num_searches.max())
+    return key, {name: float(value) if isinstance(value, np.floating) else value for name, value in stats.items()}
+
+
+def run_sweep(cells, games, seed, workers=None, cache_dir=CACHE_DIR):
+    """Return the statistics of every cell in order & the number of cells played, cached cells aren't played again"""
+    version = code_version()
+    keys = [cell_key(cell, games, seed, version) for cell in cells]
+    results = {key: load_cell(cache_dir, key) for key in keys}
+    todo = [(key, cell, games, seed) for key, cell in zip(keys, cells) if results[key] is None]
+    if todo:
+        if workers is None:
+            workers = os.cpu_count()
+        # Same as the Monte Carlo runner, fork where the platform has it so the workers share the parent's imports
+        context = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else None)
+        with context.Pool(min(workers, len(todo))) as pool:
+            # Save each cell as soon as it's done so a killed sweep keeps what it finished
+            for key, stats in pool.imap_unordered(play_cell, todo):
+                save_cell(cache_dir, key, stats)
+                results[key] = stats
+    return [results[key] for key in keys], len(todo)
+
+
+# Part 4 - Output
+def write_csv(rows, out):
+    """Write the statistics of every cell as CSV"""
+    writer = csv.DictWriter(out, fieldnames=COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({name: row[name] for name in COLUMNS})
+
+
+def print_table(rows):
+    """Print 1 row of searches to find statistics per cell"""
+    header = "{:>18}{:>12}{:>10}{:>10}{:>10}{:>10}".format('Priors', 'SEPs', 'Strategy', 'Mean', '+/-', 'Median')
+    for pct in PERCENTILES:
+        header += "{:>8}".format('P%d' % pct)
+    print(header + "{:>8}".format('Max'))
+    for row in rows:
+        line = "{:>18}{:>12}{:>10}{:>10.4f}{:>10.4f}{:>10.1f}".format(row['priors'], row['sep_dist'], row['strategy'],
+                                                                     row['mean'], row['ci_95'], row['median'])
+        for pct in PERCENTILES:
+            line += "{:>8.1f}".format(row['p%d' % pct])
+        print(line + "{:>8d}".format(row['max']))
+
+
+def parse_priors(text):
+    """Return the priors of 1 --priors entry, comma separated probs like 0.2,0.5,0.3"""
+    priors = tuple(float(p) for p in text.split(','))
+    # The batch simulator plays the 3 areas of the default map
+    if len(priors) != len(PRIORS) or min(priors) < 0 or abs(sum(priors) - 1) > 1e-6:
+        raise argparse.ArgumentTypeError('priors must be {} probs adding up to 1, got {}'.format(len(PRIORS), text))
+    return priors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep of the search strategies over priors & SEP distributions')
+    parser.add_argument('--priors', type=parse_priors, nargs='+', default=[PRIORS],
+                        help='sets of priors to sweep, each comma separated like 0.2,0.5,0.3')
+    parser.add_argument('--sep-dists', nargs='+', choices=('uniform', 'triangular'), default=['uniform', 'triangular'],
+                        help='SEP distributions to sweep')
+    parser.add_argument('--strategies', nargs='+', choices=list(STRATEGIES), default=list(STRATEGIES),
+                        help='strategies to sweep (default all registered)')
+    parser.add_argument('--games', type=int, default=NUM_GAMES, help='games per cell')
+    parser.add_argument('--seed', type=int, default=0, help='seed of every cell, part of the cache key')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of worker processes')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='folder of the cached cells')
+    parser.add_argument('--csv', default=None, help="write a CSV to this file ('-' for stdout) instead of a table")
+    args = parser.parse_args()
+
+    cells = [(priors, sep_dist, name) for priors in args.priors for sep_dist in args.sep_dists
+             for name in args.strategies]
+    start = time.perf_counter()
+    rows, played = run_sweep(cells, args.games, args.seed, args.workers, args.cache_dir)
+    elapsed = time.perf_counter() - start
+    if args.csv == '-':
+        write_csv(rows, sys.stdout)
+    elif args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            write_csv(rows, f)
+    else:
+        print_table(rows)
+    print("%d cells, %d played & %d from the cache in %.2f seconds" % (len(cells), played, len(cells) - played,
+                                                                       elapsed), file=sys.stderr)
+
+
+# Run main
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Tournament between the registered search strategies. Every strategy plays the same games, the sailor is put in the
+same place and the same SEPs are drawn for every round, so the differences between the strategies come from their
+choices and not from luck (common random numbers). With --antithetic the games also come in antithetic pairs, the
+2nd game of a pair uses 1 - u for the uniform draws behind the SEPs & detections. Prints the mean, median &
+percentiles of the searches to find the sailor, the games per second for each strategy and how much the variance of
+the estimates dropped compared to independent games.
+"""
+import time
+import argparse
+import numpy as np
+from sailorSearch_batch import simulate_batch
+from sailorSearch_strategies import STRATEGIES
+
+# Number of games every strategy plays
+NUM_GAMES = 200000
+
+# Percentiles of the searches to find the sailor to report
+PERCENTILES = (90, 99)
+
+# z value for the 95% confidence intervals
+Z_95 = 1.96
+
+
+def run_tournament(names, num_games, seed, antithetic=False, sep_dist='uniform'):
+    """Return a dict of strategy name to (array of searches per game, games per second), all on the same games"""
+    results = {}
+    for name in names:
+        start = time.perf_counter()
+        num_searches = simulate_batch(STRATEGIES[name], num_games, seed, antithetic, sep_dist)
+        elapsed = time.perf_counter() - start
+        results[name] = (num_searches, num_games / elapsed)
+    return results
+
+
+def print_table(results):
+    """Print one row of searches to find statistics per strategy"""
+    header = "{:>10}{:>10}{:>10}".format('Strategy', 'Mean', 'Median')
+    for pct in PERCENTILES:
+        header += "{:>10}".format('P%d' % pct)
+    header += "{:>10}{:>14}".format('Max', 'Games/sec')
+    print(header)
+    for name, (num_searches, games_per_sec) in results.items():
+        row = "{:>10}{:>10.3f}{:>10.1f}".format(name, num_searches.mean(), np.median(num_searches))
+        for pct in PERCENTILES:
+            row += "{:>10.1f}".format(np.percentile(num_searches, pct))
+        row += "{:>10d}{:>14,.0f}".format(int(num_searches.max()), games_per_sec)
+        print(row)
+
+
+# Variance reduction
+def pair_means(x):
+    """Return the average of each antithetic pair, game i is paired with game i + (n + 1) // 2"""
+    offset = (len(x) + 1) // 2
+    half = len(x) // 2
+    return (x[:half] + x[offset:offset + half]) / 2
+
+
+def mean_variance(x, antithetic):
+    """Return the variance of the estimated mean of x, from the pair averages when the games were antithetic"""
+    if antithetic:
+        pairs = pair_means(x)
+        return pairs.var(ddof=1) / len(pairs)
+    return x.var(ddof=1) / len(x)
+
+
+def print_variance_report(results, antithetic):
+    """Print the 95% CIs and how many times fewer runs the paired games need than independent ones"""
+    print("\nVariance reduction (ratio = variance with independent games / variance achieved)")
+    print("{:>16}{:>10}{:>12}{:>10}".format('Estimate', 'Value', '95% CI +/-', 'Ratio'))
+    # Mean of each strategy, only antithetic pairs can help here
+    for name, (num_searches, _) in results.items():
+        independent = num_searches.var(ddof=1) / len(num_searches)
+        achieved = mean_variance(num_searches.astype(float), antithetic)
+        print("{:>16}{:>10.3f}{:>12.4f}{:>10.2f}".format(name, num_searches.mean(), Z_95 * np.sqrt(achieved),
+                                                          independent / achieved))
+    # Difference of each strategy to the first one, common random numbers pay off here
+    names = list(results)
+    base = results[names[0]][0].astype(float)
+    for name in names[1:]:
+        other = results[name][0].astype(float)
+        independent = base.var(ddof=1) / len(base) + other.var(ddof=1) / len(other)
+        achieved = mean_variance(other - base, antithetic)
+        print("{:>16}{:>10.3f}{:>12.4f}{:>10.2f}".format('%s - %s' % (name, names[0]), (other - base).mean(),
+                                                          Z_95 * np.sqrt(achieved), independent / achieved))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play every search strategy on the same set of games')
+    parser.add_argument('--games', type=int, default=NUM_GAMES, help='games per strategy')
+    parser.add_argument('--seed', type=int, default=None, help='seed for reproducible runs')
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES),
+                        help='strategies to play (default all registered)')
+    parser.add_argument('--antithetic', action='store_true', help='play the games in antithetic pairs')
+    parser.add_argument('--sep-dist', choices=('uniform', 'triangular'), default='uniform',
+                        help='distribution of the SEP draws')
+    args = parser.parse_args()
+    # Pick the seed here so every strategy gets the same one
+    seed = args.seed if args.seed is not None else np.random.SeedSequence().entropy
+
+    results = run_tournament(args.strategies, args.games, seed, args.antithetic, args.sep_dist)
+    print("%d games per strategy (seed %d)\n" % (args.games, seed))
+    print_table(results)
+    print_variance_report(results, args.antithetic)
+
+
+# Run main
+if __name__ == '__main__':
+    main()
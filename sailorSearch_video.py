@@ -0,0 +1,261 @@
+"""
+Video export of simulated sailor search games, to review a campaign without watching cv.imshow windows 1 at a time.
+Plays 1 game, or a grid of games side by side, headless with a strategy (or from a game log of sailorSearch_replay.py)
+and writes 1 frame per round to a video (.mp4, .avi) or an animated file (.gif, .webp, .apng). No window or display
+is ever opened.
+
+Every frame is the cached base map with the cells searched so far greyed out, the pixel map of where the sailor can
+still be as a heat overlay, the round number and the sailor's marker (filled once found). The frames are composed
+incrementally into 1 canvas: each round only the cells it searched are painted, the heat is only repainted when its
+scale changes (the densest area ran out of unsearched cells), and the label & marker are stamped on before the frame
+is written & the pixels under them put back after. The cost of a frame is the cells searched that round plus the
+encoding, not the size of the map.
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import cv2 as cv
+from sailorSearch import Search, base_layer, new_seed, seed_game
+from sailorSearch_replay import load_games
+from sailorSearch_strategies import STRATEGIES, choose
+
+# Part 1 - Constants
+# File the video is written to
+VIDEO_FILE = 'search.mp4'
+
+# FourCC code of the codec for each video file type, the rest of the file types are animations
+VIDEO_CODECS = {'.mp4': 'mp4v', '.avi': 'MJPG'}
+ANIMATION_TYPES = ('.gif', '.webp', '.apng')
+
+# Frames per second, 1 frame is 1 round
+FPS = 2
+
+# Seconds the last frame is held for, like the 1.5 second pause of the game when the sailor is found
+HOLD_SECONDS = 1.5
+
+# Longest game played, a game still going after this many rounds stops there
+MAX_ROUNDS = 500
+
+# Sailor's last known position, where the game puts the '+'
+LAST_KNOWN = (160, 290)
+
+# Heat overlay of the pixel map, how much of the map shows through & the color map
+HEAT_ALPHA = 0.5
+HEAT_COLORMAP = cv.COLORMAP_JET
+
+# Searched cells are greyed out
+SEARCHED_COLOR = (90, 90, 90)
+SEARCHED_ALPHA = 0.6
+
+# Sailor marker, same color as the game's, & the round label in the upper-left corner
+SAILOR_COLOR = (255, 0, 0)
+SAILOR_RADIUS = 3
+LABEL_ORIGIN = (8, 20)
+
+
+# Part 2 - Play the games headless
+def searched_since(app, left):
+    """Return the flat map indexes of the cells searched since each area had left cells unsearched"""
+    # Searches move the cells they pick in front of the area's cursor, so the new cells are the order between the
+    # old & new cursors
+    ends = app.starts[1:]
+    return app.cells[np.concatenate([app.order[end - before:end - after]
+                                     for end, before, after in zip(ends, left, app.unsearched)])]
+
+
+def play_game(app, seed, strategy=None, choices=None, max_rounds=MAX_ROUNDS):
+    """Play a game headless on app with strategy picking every choice, or with the choices of a logged game, return
+    the sailor's cell, the cells each round searched & whether the sailor was found"""
+    # Same start as sailorSearch_replay.py so a logged game plays out the same
+    seed_game(seed)
+    app.reseed()
+    app.reset()
+    app.sailor_final_location(num_search_areas=app.num_areas)
+    rounds = []
+    found = False
+    while not found and len(rounds) < max_rounds and (choices is None or len(rounds) < len(choices)):
+        app.calc_search_effectiveness()
+        choice = choose(strategy, app.probs, app.seps) if choices is None else choices[len(rounds)]
+        left = app.unsearched.copy()
+        _, _, found_1, found_2 = app.search_choice(choice)
+        app.revise_target_probs()
+        rounds.append(searched_since(app, left))
+        found = found_1 or found_2
+    return app.sailor_cell, rounds, found
+
+
+# Part 3 - Compose the frames incrementally
+class GameTile():
+    """1 game's part of the canvas, painted a round at a time"""
+    def __init__(self, app, tile, sailor_cell, rounds, found):
+        self.tile = tile
+        self.rounds = rounds
+        self.found = found
+        self.base = base_layer(app.areas, LAST_KNOWN, app.map_file)
+        self.tile[...] = self.base
+        y, x = np.unravel_index(sailor_cell, app.labels.shape)
+        self.sailor = (int(x), int(y))
+        # Each area's prior is spread evenly over its cells, so the pixel map is that density on the unsearched cells
+        self.shape = app.labels.shape
+        self.cells = app.cells
+        self.cell_areas = app.labels.ravel()
+        # An area that is all land has no cells & a prior of 0
+        self.density = app.priors / np.maximum(app.sizes, 1)
+        self.left = app.sizes.copy()
+        self.searched = np.zeros(app.labels.size, dtype=bool)
+        self.heat_colors = cv.applyColorMap(np.arange(256, dtype=np.uint8)[:, None], HEAT_COLORMAP)[:, 0]
+        self.scale = None
+        self.paint_heat()
+
+    def blend(self, cells, colors, alpha):
+        """Paint colors over the base map at cells (flat map indexes), alpha of the color & the rest of the base"""
+        ys, xs = np.unravel_index(cells, self.shape)
+        self.tile[ys, xs] = (alpha * colors + (1 - alpha) * self.base[ys, xs]).astype(np.uint8)
+
+    def paint_heat(self):
+        """Repaint the heat of every unsearched cell if the densest area left has changed the scale"""
+        scale = self.density[self.left > 0].max() if (self.left > 0).any() else None
+        if scale == self.scale:
+            return
+        self.scale = scale
+        cells = self.cells[~self.searched[self.cells]]
+        if scale is not None:
+            levels = (self.density[self.cell_areas[cells]] / scale * 255).astype(np.uint8)
+            self.blend(cells, self.heat_colors[levels], HEAT_ALPHA)
+
+    def advance(self, search_num):
+        """Paint the cells round search_num searched, nothing changes before the 1st round or once the game is over"""
+        if not 1 <= search_num <= len(self.rounds):
+            return
+        cells = self.rounds[search_num - 1]
+        self.searched[cells] = True
+        self.left -= np.bincount(self.cell_areas[cells], minlength=len(self.left))
+        self.blend(cells, np.array(SEARCHED_COLOR), SEARCHED_ALPHA)
+        self.paint_heat()
+
+    def stamp(self, search_num):
+        """Draw the round label & the sailor marker, return the patches they covered so they can be put back"""
+        search_num = min(search_num, len(self.rounds))
+        found = self.found and search_num == len(self.rounds)
+        if found:
+            label = 'Found on search %d' % search_num
+        else:
+            label = 'Search %d' % search_num if search_num else 'Start'
+        (width, height), baseline = cv.getTextSize(label, cv.FONT_HERSHEY_PLAIN, 1, 1)
+        boxes = [(slice(LABEL_ORIGIN[1] - height - 1, LABEL_ORIGIN[1] + baseline + 1),
+                  slice(LABEL_ORIGIN[0] - 1, LABEL_ORIGIN[0] + width + 1)),
+                 (slice(max(self.sailor[1] - SAILOR_RADIUS - 1, 0), self.sailor[1] + SAILOR_RADIUS + 2),
+                  slice(max(self.sailor[0] - SAILOR_RADIUS - 1, 0), self.sailor[0] + SAILOR_RADIUS + 2))]
+        patches = [(box, self.tile[box].copy()) for box in boxes]
+        cv.putText(self.tile, label, LABEL_ORIGIN, cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 0))
+        cv.circle(self.tile, self.sailor, SAILOR_RADIUS, SAILOR_COLOR, -1 if found else 1)
+        return patches
+
+    def restore(self, patches):
+        """Put back the pixels under the label & marker"""
+        for box, patch in patches:
+            self.tile[box] = patch
+
+
+# Part 4 - Write the frames
+class FrameWriter():
+    """Frames to a video file as they come, or to an animated file once they're all in"""
+    def __init__(self, out, fps, size):
+        self.out = out
+        self.fps = fps
+        self.kind = os.path.splitext(out)[1].lower()
+        if self.kind in VIDEO_CODECS:
+            self.video = cv.VideoWriter(out, cv.VideoWriter_fourcc(*VIDEO_CODECS[self.kind]), fps, size)
+            if not self.video.isOpened():
+                raise ValueError('OpenCV could not open a {} video writer for {}'.format(VIDEO_CODECS[self.kind], out))
+        elif self.kind in ANIMATION_TYPES:
+            if not hasattr(cv, 'imwriteanimation'):
+                raise ValueError('This OpenCV has no animation writer, write a {} instead'.format(
+                    ' or '.join(VIDEO_CODECS)))
+            # The canvas is reused for every frame, so an animation keeps copies until it's written
+            self.frames = []
+        else:
+            raise ValueError('Can not write {}, use 1 of {}'.format(out, ', '.join(tuple(VIDEO_CODECS) +
+                                                                                 ANIMATION_TYPES)))
+
+    def write(self, frame):
+        """Add 1 frame, encoded right away for a video & copied for an animation"""
+        if self.kind in VIDEO_CODECS:
+            self.video.write(frame)
+        else:
+            self.frames.append(frame.copy())
+
+    def close(self):
+        """Finish the file, an animation is only written now that every frame is in"""
+        if self.kind in VIDEO_CODECS:
+            self.video.release()
+        else:
+            animation = cv.Animation()
+            animation.frames = self.frames
+            animation.durations = [int(1000 / self.fps)] * len(self.frames)
+            cv.imwriteanimation(self.out, animation)
+
+
+def export_games(app, games, out, cols=None, fps=FPS):
+    """Write the games (sailor cell, rounds, found from play_game() on app) side by side, cols to a row, return the
+    number of frames written"""
+    cols = cols or int(np.ceil(np.sqrt(len(games))))
+    rows = -(-len(games) // cols)
+    height, width = app.labels.shape
+    canvas = np.zeros((rows * height, cols * width, 3), dtype=np.uint8)
+    # Each game paints straight into its own view of the canvas, nothing is copied to make a frame
+    tiles = [GameTile(app, canvas[i // cols * height:(i // cols + 1) * height, i % cols * width:(i % cols + 1) * width],
+                      *game) for i, game in enumerate(games)]
+    writer = FrameWriter(out, fps, (canvas.shape[1], canvas.shape[0]))
+    num_rounds = max(len(tile.rounds) for tile in tiles)
+    hold = max(int(round(HOLD_SECONDS * fps)), 1)
+    for search_num in range(num_rounds + hold):
+        for tile in tiles:
+            tile.advance(search_num)
+        patches = [tile.stamp(search_num) for tile in tiles]
+        writer.write(canvas)
+        for tile, tile_patches in zip(tiles, patches):
+            tile.restore(tile_patches)
+    writer.close()
+    return num_rounds + hold
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write simulated search games to a video, no window needed')
+    parser.add_argument('--out', default=VIDEO_FILE, help='video (.mp4, .avi) or animation (.gif, .webp, .apng)')
+    parser.add_argument('--games', type=int, default=1, help='games to show side by side')
+    parser.add_argument('--cols', type=int, default=None, help='games to a row (default a square grid)')
+    parser.add_argument('--strategy', choices=list(STRATEGIES), default='pod', help='strategy that plays the games')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the 1st game, the next games count up from it')
+    parser.add_argument('--log', default=None, help='play the first --games games of this game log instead')
+    parser.add_argument('--fps', type=float, default=FPS, help='frames (rounds) per second')
+    parser.add_argument('--max-rounds', type=int, default=MAX_ROUNDS, help='longest game to play')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    # The games are played 1 after the other on 1 Search, each only keeps the cells its rounds searched
+    app = Search('Video', verbose=False)
+    games = []
+    if args.log:
+        for game in load_games(args.log)[:args.games]:
+            choices = [choice for choice, *_ in game['rounds']]
+            games.append(play_game(app, game['seed'], choices=choices, max_rounds=args.max_rounds))
+    else:
+        for i in range(args.games):
+            seed = new_seed() if args.seed is None else args.seed + i
+            games.append(play_game(app, seed, STRATEGIES[args.strategy], max_rounds=args.max_rounds))
+    if not games:
+        print('No games to write', file=sys.stderr)
+        sys.exit(1)
+    played = time.perf_counter() - start
+    num_frames = export_games(app, games, args.out, args.cols, args.fps)
+    elapsed = time.perf_counter() - start - played
+    print("%d games played in %.3f seconds, %d frames written to %s in %.3f seconds (%.0f frames/sec)" % (
+        len(games), played, num_frames, args.out, elapsed, num_frames / elapsed))
+
+
+# Run main
+if __name__ == '__main__':
+    main()